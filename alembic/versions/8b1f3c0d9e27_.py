@@ -0,0 +1,31 @@
+"""trigram index for food search on postgresql
+
+Revision ID: 8b1f3c0d9e27
+Revises: 2e42d2b00a10
+Create Date: 2026-10-18 14:12:45.208114
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '8b1f3c0d9e27'
+down_revision = '2e42d2b00a10'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # only used with FOOD_SEARCH = 'pg_trgm'
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+    op.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    op.execute('CREATE INDEX ix_foods_name_trgm ON foods '
+               'USING gin (name gin_trgm_ops)')
+
+
+def downgrade():
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+    op.drop_index('ix_foods_name_trgm', table_name='foods')
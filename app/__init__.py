@@ -33,6 +33,20 @@ def create_app(config_class=Config):
 
     app.register_blueprint(api_bp, url_prefix="/api")
     from app import models
+    from app.service import (
+        request_cache,
+        instrumentation,
+        json_encoding,
+        metrics,
+        response_cache,
+    )
+
+    app.after_request(request_cache.clear)
+    app.teardown_request(request_cache.clear)
+    instrumentation.init_app(app)
+    metrics.init_app(app)
+    response_cache.init_app(app)
+    json_encoding.init_app(app)
 
     if not app.debug and not app.testing:
 
@@ -15,4 +15,5 @@ from app.api import (
     entries,
     days,
     foods,
+    transfer,
 )
@@ -1,50 +1,60 @@
 from flask import jsonify, request
-from app.models import List, Food, FoodCategory, FoodCategoryAssociation
+from app.models import Food, FoodCategory
 from app import db
 from app.api import bp
-from app.api.decorators import list_access_required, login_required
+from app.api.decorators import (
+    list_access_required,
+    login_required,
+    conditional,
+    cached,
+)
 from app.api.exceptions import APIError
+from app.service import read_models
+from app.service.foods import associate_categories, dissociate_categories
 
 
 @bp.route("/lists/<list_id>/categories", methods=["GET"])
 @login_required
 @list_access_required
-def get_categories_by_list(list_id):
-    list_ = List.query.filter_by(id=list_id).first()
-    json_obj = [i.to_dict() for i in list_.categories]
+@conditional
+@cached
+def get_categories_by_list(list_id, list_):
+    json_obj = read_models.categories(list_.id)
     return jsonify(json_obj), 200
 
 
 @bp.route("/lists/<list_id>/categories", methods=["POST"])
 @login_required
 @list_access_required
-def post_categories(list_id):
+def post_categories(list_id, list_):
     req = request.get_json()
     if not req:
         raise APIError("application/json is required")
     if "name" not in req:
         raise APIError("name is required")
-    list_ = List.query.filter_by(id=list_id).first()
     if req["name"] in [i.name for i in list_.categories]:
         raise APIError(f'FoodCategory {req["name"]} already exists')
     foodcategory = FoodCategory(name=req["name"], list_id=list_id)
     db.session.add(foodcategory)
+    list_.touch()
     db.session.commit()
-    json_obj = [category.to_dict() for category in list_.categories]
+    json_obj = read_models.categories(list_.id)
     return jsonify(json_obj), 201
 
 
 @bp.route("/lists/<list_id>/categories/<category_id>", methods=["DELETE"])
 @login_required
 @list_access_required
-def delete_category_by_list(list_id, category_id):
-    list_ = List.query.filter_by(id=list_id).first()
-    category = FoodCategory.query.filter_by(id=category_id).first()
+def delete_category_by_list(list_id, category_id, list_):
+    category = FoodCategory.query.filter_by(
+        id=category_id, list_id=list_.id
+    ).first()
     if not category:
         raise APIError(f"No category with id {category_id} exists", 404)
     db.session.delete(category)
+    list_.touch()
     db.session.commit()
-    json_obj = [category.to_dict() for category in list_.categories]
+    json_obj = read_models.categories(list_.id)
     return jsonify(json_obj), 200
 
 
@@ -75,10 +85,8 @@ def post_category_association(food_id, category_id):
         raise APIError(
             f"Category {category_id} is already linked to food {food_id}"
         )
-    foodcategoryassociation = FoodCategoryAssociation(
-        food_id=food.id, category_id=category.id
-    )
-    db.session.add(foodcategoryassociation)
+    associate_categories([(food.id, category.id)])
+    food.list_.touch()
     db.session.commit()
     json_obj = [category.category.to_dict() for category in food.categories]
     return jsonify(json_obj)
@@ -99,10 +107,8 @@ def delete_category(food_id, category_id):
         raise APIError(
             f"Category {category_id} does not belong to Food {food_id}"
         )
-    category_association = FoodCategoryAssociation.query.filter_by(
-        food_id=food.id, category_id=category.id
-    ).first()
-    db.session.delete(category_association)
+    dissociate_categories([(food.id, category.id)])
+    food.list_.touch()
     db.session.commit()
     json_obj = [category.category.to_dict() for category in food.categories]
     return jsonify(json_obj)
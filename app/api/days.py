@@ -1,41 +1,42 @@
 from flask import jsonify, request
 from flask_login import current_user
-from app.models import List
 from app.api import bp
-from app.api.decorators import list_access_required, login_required
+from app.api.decorators import (
+    list_access_required,
+    login_required,
+    conditional,
+    cached,
+)
 from app.api.helpers import extract_args
 
 
 @bp.route("/days", methods=["GET"])
 @login_required
+@conditional
 def get_days():
     args = extract_args(request.args)
     lists = current_user.get_lists()
-    days = [
-        l.get_or_create_days(
-            args["offset"], args["limit"], args["start_today"]
-        )
-        for l in lists
-    ]
-    json_obj_days = [day.to_dict() for sublist in days for day in sublist]
+    json_obj_days = []
+    for l in lists:
+        days = l.get_days(args["offset"], args["limit"], args["start_today"])
+        entries = l.get_entries(days)
+        json_obj_days += [
+            day.to_dict(day_entries) for day, day_entries in zip(days, entries)
+        ]
     return jsonify(json_obj_days), 200
 
 
 @bp.route("/lists/<list_id>/days", methods=["GET"])
 @login_required
 @list_access_required
-def get_days_by_list(list_id):
+@conditional
+@cached
+def get_days_by_list(list_id, list_):
     args = extract_args(request.args)
-    list_ = List.query.filter_by(id=list_id).first()
-    days = list_.get_or_create_days(
-        args["offset"], args["limit"], args["start_today"]
-    )
+    days = list_.get_days(args["offset"], args["limit"], args["start_today"])
+    entries = list_.get_entries(days)
     json_obj = [
-        {
-            "day": d.day,
-            "id": d.id,
-            "entries": [e.id for e in d.get_or_create_entries()],
-        }
-        for d in days
+        {"day": d.day, "id": d.id, "entries": [e.id for e in day_entries]}
+        for d, day_entries in zip(days, entries)
     ]
     return jsonify(json_obj), 200
@@ -1,7 +1,12 @@
 from functools import wraps
+from flask import current_app, make_response, request
 from flask_login import current_user
-from app.models import List, Entry
+from app.models import List, Meal, VirtualEntry
 from app.api.exceptions import APIError
+from app.service.access import get_permission_level, get_entry_access
+from app.service.etags import list_versions, compute_etag
+from app.service import response_cache
+from app.service.request_cache import memoize
 
 # TODO is this needed?
 # def check_confirmed(func):
@@ -13,29 +18,41 @@ from app.api.exceptions import APIError
 #     return decorated_function
 
 
+def get_list(list_id):
+    return memoize(
+        "list", str(list_id), lambda: List.query.filter_by(id=list_id).first()
+    )
+
+
 def list_access_required(func):
+    """Passes the list to the view as list_"""
+
     @wraps(func)
     def decorated_function(*args, **kwargs):
         list_id = kwargs["list_id"]
-        list_ = List.query.filter_by(id=list_id).first()
+        list_ = get_list(list_id)
         if not list_:
             raise APIError(f"No list with id {list_id}", 404)
-        if current_user not in list_.get_users_with_access():
+        if not get_permission_level(list_.id, current_user.id):
             raise APIError("You don't have access to this page", 403)
+        kwargs["list_"] = list_
         return func(*args, **kwargs)
 
     return decorated_function
 
 
 def list_owner_required(func):
+    """Passes the list to the view as list_"""
+
     @wraps(func)
     def decorated_function(*args, **kwargs):
         list_id = kwargs["list_id"]
-        list_ = List.query.filter_by(id=list_id).first()
+        list_ = get_list(list_id)
         if not list_:
             raise APIError(f"No list with id {list_id}", 404)
-        if current_user not in list_.get_owners():
+        if get_permission_level(list_.id, current_user.id) != "owner":
             raise APIError("Only the list owner can perform this action", 403)
+        kwargs["list_"] = list_
         return func(*args, **kwargs)
 
     return decorated_function
@@ -45,17 +62,73 @@ def entry_access_required(func):
     @wraps(func)
     def decorated_function(*args, **kwargs):
         entry_id = kwargs["entry_id"]
-        entry = Entry.query.filter_by(id=entry_id).first()
-        if not entry:
-            raise APIError(f"No entry with id {entry_id}", 404)
-        list_ = entry.day.list_
-        if current_user not in list_.get_users_with_access():
+        virtual_id = VirtualEntry.parse_id(entry_id)
+        if virtual_id:
+            list_id, _, meal_id = virtual_id
+            if not Meal.query.filter_by(id=meal_id, list_id=list_id).first():
+                raise APIError(f"No entry with id {entry_id}", 404)
+            level = get_permission_level(list_id, current_user.id)
+        else:
+            access = get_entry_access(entry_id, current_user.id)
+            if not access:
+                raise APIError(f"No entry with id {entry_id}", 404)
+            _, level = access
+        if not level:
             raise APIError("You don't have access to this page", 403)
         return func(*args, **kwargs)
 
     return decorated_function
 
 
+def conditional(func):
+    """
+    Sends a strong ETag derived from the version of list_, or of every
+    list of the current user, and answers a matching If-None-Match with
+    304 before the view runs
+    """
+
+    @wraps(func)
+    def decorated_function(*args, **kwargs):
+        if "list_" in kwargs:
+            list_ = kwargs["list_"]
+            versions = [(list_.id, list_.last_updated)]
+        else:
+            versions = list_versions(current_user.id)
+        etag = compute_etag(current_user.id, versions)
+        if request.if_none_match.contains(etag):
+            response = current_app.response_class(status=304)
+        else:
+            response = make_response(func(*args, **kwargs))
+        response.set_etag(etag)
+        return response
+
+    return decorated_function
+
+
+def cached(func):
+    """
+    Serves the response for list_ from the response cache, keyed like
+    the ETag so any write to the list, which bumps its last_updated,
+    makes older entries unreachable
+    """
+
+    @wraps(func)
+    def decorated_function(*args, **kwargs):
+        list_ = kwargs["list_"]
+        key = compute_etag(current_user.id, [(list_.id, list_.last_updated)])
+        body = response_cache.lookup(key)
+        if body is not None:
+            return current_app.response_class(
+                body, mimetype="application/json"
+            )
+        response = make_response(func(*args, **kwargs))
+        if response.status_code == 200:
+            response_cache.store(key, response.get_data())
+        return response
+
+    return decorated_function
+
+
 def login_required(func):
     @wraps(func)
     def decorated_function(*args, **kwargs):
@@ -1,30 +1,34 @@
-from flask import jsonify, request
+from flask import current_app, jsonify, request
 from flask_login import current_user
-from app.models import List, Entry
+from app.models import Day, Entry, Meal, VirtualEntry
 from app import db
 from app.api import bp
 from app.api.decorators import (
     list_access_required,
     login_required,
     entry_access_required,
+    get_list,
+    conditional,
+    cached,
 )
 from app.api.exceptions import APIError
-from app.api.helpers import extract_args
+from app.api.helpers import extract_args, parse_day
+
+MAX_BATCH_SIZE = 500
 
 
 @bp.route("/entries", methods=["GET"])
 @login_required
+@conditional
 def get_entries():
     args = extract_args(request.args)
     lists = current_user.get_lists()
-    days = [
-        l.get_or_create_days(
-            args["offset"], args["limit"], args["start_today"]
-        )
-        for l in lists
-    ]
-    entries = [d.get_or_create_entries() for sublist in days for d in sublist]
-    json_obj_entries = [e.to_dict() for sublist in entries for e in sublist]
+    json_obj_entries = []
+    for l in lists:
+        days = l.get_days(args["offset"], args["limit"], args["start_today"])
+        json_obj_entries += [
+            e.to_dict() for day in l.get_entries(days) for e in day
+        ]
     return jsonify(json_obj_entries), 200
 
 
@@ -36,8 +40,22 @@ def patch_entry(entry_id):
     req = request.get_json()
     if not req:
         raise APIError("application/json is required")
-    entry = Entry.query.filter_by(id=entry_id).first_or_404()
+    virtual_id = VirtualEntry.parse_id(entry_id)
+    if virtual_id:
+        list_id, day, meal_id = virtual_id
+        list_ = get_list(list_id)
+        entry = list_.find_entry(day, meal_id)
+        if not entry:
+            if not req["value"]:
+                # only entries holding a value get stored
+                meal = Meal.query.filter_by(id=meal_id).first()
+                return jsonify(VirtualEntry(list_, day, meal).to_dict()), 200
+            entry = list_.get_or_create_entry(day, meal_id)
+    else:
+        entry = Entry.query.filter_by(id=entry_id).first_or_404()
+        list_ = get_list(entry.day.list_id)
     entry.value = req["value"]
+    list_.touch()
     db.session.commit()
     return jsonify(entry.to_dict()), 200
 
@@ -45,12 +63,118 @@ def patch_entry(entry_id):
 @bp.route("/lists/<list_id>/entries", methods=["GET"])
 @login_required
 @list_access_required
-def get_entries_by_list(list_id):
+@conditional
+@cached
+def get_entries_by_list(list_id, list_):
     args = extract_args(request.args)
-    list_ = List.query.filter_by(id=list_id).first()
-    days = list_.get_or_create_days(
-        args["offset"], args["limit"], args["start_today"]
-    )
-    entries = [e.get_or_create_entries() for e in days]
+    days = list_.get_days(args["offset"], args["limit"], args["start_today"])
+    entries = list_.get_entries(days)
     json_obj = [e.to_dict() for sublist in entries for e in sublist]
     return jsonify(json_obj), 200
+
+
+def parse_entry_updates(req, list_):
+    """
+    Validates a batch of entry updates and returns them as
+    (entry_id, cell, value) where either the entry id or the
+    (day, meal_id) cell is set
+    """
+    if not isinstance(req, list):
+        raise APIError("A list of entries is required")
+    if len(req) > MAX_BATCH_SIZE:
+        raise APIError(
+            f"At most {MAX_BATCH_SIZE} entries can be updated at once"
+        )
+    updates = []
+    for item in req:
+        if not isinstance(item, dict) or "value" not in item:
+            raise APIError(f"No value received in {item}")
+        if not isinstance(item["value"], str):
+            raise APIError(f"value needs to be a string in {item}")
+        if "id" in item:
+            virtual_id = VirtualEntry.parse_id(item["id"])
+            if virtual_id:
+                list_id, day, meal_id = virtual_id
+                if list_id != list_.id:
+                    raise APIError(f'No entry with id {item["id"]}', 404)
+                updates.append((None, (day, meal_id), item["value"]))
+            elif type(item["id"]) is int:
+                updates.append((item["id"], None, item["value"]))
+            else:
+                raise APIError(f'No entry with id {item["id"]}', 404)
+        elif "day" in item and "meal_id" in item:
+            if type(item["meal_id"]) is not int:
+                raise APIError(f"meal_id needs to be an integer in {item}")
+            cell = (parse_day(item["day"]), item["meal_id"])
+            updates.append((None, cell, item["value"]))
+        else:
+            raise APIError(f"Either id or day and meal_id are required {item}")
+    return updates
+
+
+@bp.route("/lists/<list_id>/entries", methods=["PATCH"])
+@login_required
+@list_access_required
+def patch_entries_by_list(list_id, list_):
+    req = request.get_json()
+    if not req:
+        raise APIError("application/json is required")
+    updates = parse_entry_updates(req, list_)
+    meals = {m.id: m for m in list_.get_or_create_meals()}
+    for _, cell, _ in updates:
+        if cell and cell[1] not in meals:
+            raise APIError(f"No meal with id {cell[1]} exists", 404)
+
+    # entries sent by id have to belong to this list, checked in one query
+    entry_ids = {entry_id for entry_id, _, _ in updates if entry_id}
+    if entry_ids:
+        found = {
+            i
+            for i, in db.session.query(Entry.id)
+            .join(Day, Entry.day_id == Day.id)
+            .filter(Day.list_id == list_.id, Entry.id.in_(entry_ids))
+        }
+        if entry_ids - found:
+            raise APIError(f"No entry with id {min(entry_ids - found)}", 404)
+
+    cells = {cell for _, cell, _ in updates if cell}
+    cell_ids = list_.find_entry_ids(cells)
+    # in virtual mode cells that stay empty are not stored
+    virtual = current_app.config.get("VIRTUAL_DAYS")
+    to_create = {
+        cell
+        for _, cell, value in updates
+        if cell and cell not in cell_ids and (value or not virtual)
+    }
+    if to_create:
+        cell_ids.update(list_.get_or_create_entry_ids(to_create))
+
+    values = {}
+    order = []
+    for entry_id, cell, value in updates:
+        key = entry_id or cell_ids.get(cell) or cell
+        if key not in values:
+            order.append(key)
+        values[key] = value
+    stored = {k: v for k, v in values.items() if isinstance(k, int)}
+    if stored:
+        Entry.update_values(stored)
+        list_.touch()
+        db.session.commit()
+
+    # load the meals first so every entry finds its meal without a query
+    meals = {m.id: m for m in list_.get_or_create_meals()}
+    entries = {}
+    if stored:
+        entries = {
+            e.id: e for e in Entry.query.filter(Entry.id.in_(list(stored)))
+        }
+    json_obj = [
+        (
+            entries[key].to_dict(meals)
+            if key in entries
+            else VirtualEntry(list_, key[0], meals[key[1]]).to_dict()
+        )
+        for key in order
+    ]
+    return jsonify(json_obj), 200
@@ -1,24 +1,63 @@
 from flask import jsonify, request
-from app.models import List, Food, FoodCategory, FoodCategoryAssociation
+from app.models import Food
 from app import db
 from app.api import bp
-from app.api.decorators import list_access_required, login_required
+from app.api.decorators import (
+    list_access_required,
+    login_required,
+    conditional,
+    cached,
+)
 from app.api.exceptions import APIError
+from app.service.food_search import search
+from app.service import read_models
+from app.service.foods import apply_food_changes, set_categories
+
+MAX_BATCH_SIZE = 5000
+
+
+def foods_response(list_, food, status=200):
+    """
+    Responds with the whole catalogue of list_, or with just the changed
+    food when the request has ?return=food
+    """
+    if request.args.get("return") == "food":
+        return jsonify(food), status
+    return jsonify(read_models.foods(list_.id)), status
 
 
 @bp.route("/lists/<list_id>/foods", methods=["GET"])
 @login_required
 @list_access_required
-def get_foods(list_id):
-    list_ = List.query.filter_by(id=list_id).first()
-    json_obj = [food.to_dict() for food in list_.foods]
+@conditional
+@cached
+def get_foods(list_id, list_):
+    return jsonify(read_models.foods(list_.id)), 200
+
+
+@bp.route("/lists/<list_id>/foods/search", methods=["GET"])
+@login_required
+@list_access_required
+@conditional
+def search_foods(list_id, list_):
+    q = request.args.get("q", "")
+    try:
+        limit = int(request.args.get("limit", 10))
+    except ValueError:
+        raise APIError("limit needs to be a number")
+    if limit < 1 or limit > 50:
+        raise APIError("limit needs to be between 1 and 50")
+    json_obj = [
+        {"id": food_id, "name": name, "uses": uses}
+        for food_id, name, uses in search(list_, q, limit)
+    ]
     return jsonify(json_obj), 200
 
 
 @bp.route("/lists/<list_id>/foods/<food_id>", methods=["PUT"])
 @login_required
 @list_access_required
-def put_food(list_id, food_id):
+def put_food(list_id, food_id, list_):
     req = request.get_json()
     if not req:
         raise APIError("application/json is required")
@@ -26,74 +65,203 @@ def put_food(list_id, food_id):
         raise APIError("name is required")
     if "categories" not in req:
         raise APIError("categories is required")
-    list_ = List.query.filter_by(id=list_id).first()
     food = Food.query.filter_by(list_id=list_.id, id=food_id).first()
     if not food:
         raise APIError(f"No food with id {food_id} exists", 404)
+    if (
+        req["name"] != food.name
+        and Food.query.filter_by(name=req["name"], list_id=list_.id).first()
+    ):
+        raise APIError(f'Food {req["name"]} already exists')
+    categories = check_categories(req)
+    if categories is None:
+        raise APIError("categories needs to be a list of names")
+    renamed = req["name"] != food.name
     food.name = req["name"]
-    categories_to_associate = [
-        i for i in list_.categories if i.name in req["categories"]
-    ]
-    categories_to_disassociate = [
-        i for i in list_.categories if i.name not in req["categories"]
-    ]
-    categories_to_add = [
-        i
-        for i in req["categories"]
-        if i not in [i.name for i in categories_to_associate]
-    ]
-    for category in categories_to_add:
-        fc = FoodCategory(list_id=list_.id, name=category)
-        db.session.add(fc)
-        db.session.commit()
-        fca = FoodCategoryAssociation(category_id=fc.id, food_id=food.id)
-        db.session.add(fca)
-        db.session.commit()
-    for category in categories_to_associate:
-        if category.id not in [i.category.id for i in food.categories]:
-            fca = FoodCategoryAssociation(
-                category_id=category.id, food_id=food.id
-            )
-            db.session.add(fca)
-    for category in categories_to_disassociate:
-        if category in [i.category for i in food.categories]:
-            fca = FoodCategoryAssociation.query.filter_by(
-                category_id=category.id, food_id=food.id
-            ).first()
-            db.session.delete(fca)
+    set_categories(list_.id, {food.id: categories})
+    if renamed:
+        list_.touch_foods()
+    else:
+        list_.touch()
     db.session.commit()
-    json_obj = [food.to_dict() for food in list_.foods]
-    return jsonify(json_obj)
+    return foods_response(list_, food.to_dict())
 
 
 @bp.route("/lists/<list_id>/foods/<food_id>", methods=["DELETE"])
 @login_required
 @list_access_required
-def delete_food(list_id, food_id):
-    list_ = List.query.filter_by(id=list_id).first()
+def delete_food(list_id, food_id, list_):
     food = Food.query.filter_by(list_id=list_.id, id=food_id).first()
     if not food:
         raise APIError(f"No meal with id {food_id} exists", 404)
+    deleted = food.to_dict()
     db.session.delete(food)
+    list_.touch_foods()
     db.session.commit()
-    json_obj = [food.to_dict() for food in list_.foods]
-    return jsonify(json_obj), 200
+    return foods_response(list_, deleted)
 
 
 @bp.route("/lists/<list_id>/foods", methods=["POST"])
 @login_required
 @list_access_required
-def post_foods(list_id):
+def post_foods(list_id, list_):
     req = request.get_json()
     if not req:
         raise APIError("application/json is required")
     if "name" not in req:
         raise APIError("name is required")
-    list_ = List.query.filter_by(id=list_id).first()
     if Food.query.filter_by(name=req["name"], list_id=list_.id).first():
         raise APIError(f'Food {req["name"]} already exists')
     food = Food(list_id=list_.id, name=req["name"])
     db.session.add(food)
+    list_.touch_foods()
+    db.session.commit()
+    return foods_response(list_, food.to_dict(), 201)
+
+
+def check_name(item):
+    name = item.get("name")
+    if not isinstance(name, str) or not 0 < len(name) <= 250:
+        raise APIError(f"name needs to be 1 to 250 characters in {item}")
+    return name
+
+
+def check_categories(item):
+    """Returns the category names of item, or None if it has none"""
+    categories = item.get("categories")
+    if categories is None:
+        return None
+    if not isinstance(categories, list) or not all(
+        isinstance(c, str) and 0 < len(c) <= 250 for c in categories
+    ):
+        raise APIError(f"categories needs to be a list of names in {item}")
+    return categories
+
+
+def check_id(item, current):
+    if type(item.get("id")) is not int or item["id"] not in current:
+        raise APIError(f'No food with id {item.get("id")} exists', 404)
+    return item["id"]
+
+
+def parse_food_changes(req, current):
+    """
+    Reads either the desired catalogue, {"foods": [...]}, or a list of
+    operations, {"ops": [...]}, against current, a dict of id -> name
+
+    Returns creates, renames, deletes and categories as taken by
+    apply_food_changes
+    """
+    items = req.get("foods", req.get("ops"))
+    if not isinstance(items, list) or ("foods" in req) == ("ops" in req):
+        raise APIError("Either a foods or an ops list is required")
+    if len(items) > MAX_BATCH_SIZE:
+        raise APIError(f"At most {MAX_BATCH_SIZE} foods can be sent at once")
+    if not all(isinstance(item, dict) for item in items):
+        raise APIError("Every food or op needs to be an object")
+    if "foods" in req:
+        changes = parse_catalogue(items, current)
+    else:
+        changes = parse_ops(items, current)
+    check_name_clashes(current, *changes)
+    return changes
+
+
+def parse_catalogue(items, current):
+    """Changes making items, the foods wanted, the catalogue"""
+    creates, renames, categories = [], {}, {}
+    by_name = {name: food_id for food_id, name in current.items()}
+    kept = set()
+    for item in items:
+        name = check_name(item)
+        food_categories = check_categories(item)
+        if "id" in item:
+            food_id = check_id(item, current)
+        else:
+            food_id = by_name.get(name)
+        if food_id is None:
+            creates.append((name, food_categories))
+            continue
+        if food_id in kept:
+            raise APIError(f"Food {food_id} is listed more than once")
+        kept.add(food_id)
+        if current[food_id] != name:
+            renames[food_id] = name
+        if food_categories is not None:
+            categories[food_id] = food_categories
+    return creates, renames, current.keys() - kept, categories
+
+
+def parse_ops(items, current):
+    """
+    Changes made by items, a list of create, rename, delete and
+    categories operations
+    """
+    creates, renames, deletes, categories = [], {}, set(), {}
+    for item in items:
+        op = item.get("op")
+        if op == "create":
+            creates.append((check_name(item), check_categories(item)))
+        elif op == "rename":
+            renames[check_id(item, current)] = check_name(item)
+        elif op == "delete":
+            deletes.add(check_id(item, current))
+        elif op == "categories":
+            food_categories = check_categories(item)
+            if food_categories is None:
+                raise APIError(f"categories is required in {item}")
+            categories[check_id(item, current)] = food_categories
+        else:
+            raise APIError(
+                f"op needs to be create, rename, delete or categories "
+                f"in {item}"
+            )
+    renames = {k: v for k, v in renames.items() if k not in deletes}
+    categories = {k: v for k, v in categories.items() if k not in deletes}
+    return creates, renames, deletes, categories
+
+
+def check_name_clashes(current, creates, renames, deletes, categories):
+    """Raises if the changes would leave two foods with the same name"""
+    seen = set()
+    for k, name in current.items():
+        if k not in deletes:
+            seen.add(renames.get(k, name))
+    if len(seen) < len(current) - len(deletes):
+        raise APIError("Two foods cannot be given the same name")
+    for name, _ in creates:
+        if name in seen:
+            raise APIError(f"Food {name} already exists")
+        seen.add(name)
+
+
+@bp.route("/lists/<list_id>/foods", methods=["PUT"])
+@login_required
+@list_access_required
+def put_foods(list_id, list_):
+    req = request.get_json()
+    if not isinstance(req, dict):
+        raise APIError("application/json is required")
+    current = dict(
+        db.session.query(Food.id, Food.name).filter(Food.list_id == list_.id)
+    )
+    creates, renames, deletes, categories = parse_food_changes(req, current)
+    created, recategorized = apply_food_changes(
+        list_.id, creates, renames, deletes, categories
+    )
+    updated = renames.keys() | recategorized
+    if created or renames or deletes:
+        list_.touch_foods()
+    elif recategorized:
+        list_.touch()
     db.session.commit()
-    json_obj = [food.to_dict() for food in list_.foods]
-    return jsonify(json_obj), 201
+    return (
+        jsonify(
+            {
+                "created": read_models.foods(list_.id, created),
+                "updated": read_models.foods(list_.id, updated),
+                "deleted": sorted(deletes),
+            }
+        ),
+        200,
+    )
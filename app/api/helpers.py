@@ -1,3 +1,5 @@
+from datetime import date
+from werkzeug.http import parse_date
 from app.api.exceptions import APIError
 
 
@@ -12,3 +14,14 @@ def extract_args(args):
         bool(args.get("start_today")) if "start_today" in args else False
     )
     return dict(offset=offset, limit=limit, start_today=start_today)
+
+
+def parse_day(value):
+    """Reads a day as YYYY-MM-DD or in the HTTP date format days are sent in"""
+    try:
+        return date.fromisoformat(value)
+    except (TypeError, ValueError):
+        parsed = parse_date(value) if isinstance(value, str) else None
+    if not parsed:
+        raise APIError(f"Invalid day {value}, use YYYY-MM-DD")
+    return parsed.date()
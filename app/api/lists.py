@@ -7,20 +7,22 @@ from app.api.decorators import (
     list_access_required,
     login_required,
     list_owner_required,
+    conditional,
+    cached,
 )
 from app.api.exceptions import APIError
 from app.api.helpers import extract_args
+from app.service.lists import get_lists as serialize_lists
 
 
 @bp.route("/lists", methods=["GET"])
 @login_required
+@conditional
 def get_lists():
     args = extract_args(request.args)
-    lists = current_user.get_lists()
-    json_obj = [
-        l.to_dict(args["offset"], args["limit"], args["start_today"])
-        for l in lists
-    ]
+    json_obj = serialize_lists(
+        current_user, args["offset"], args["limit"], args["start_today"]
+    )
     return jsonify(json_obj), 200
 
 
@@ -36,6 +38,7 @@ def post_list():
         raise APIError("Listname cannot be empty")
     list_ = List(name=req["listname"])
     list_.generate_api_key()
+    list_.touch()
     db.session.add(list_)
     db.session.commit()
     perm = ListPermission(
@@ -49,9 +52,10 @@ def post_list():
 @bp.route("/lists/<list_id>", methods=["GET"])
 @login_required
 @list_access_required
-def get_list(list_id):
+@conditional
+@cached
+def get_list(list_id, list_):
     args = extract_args(request.args)
-    list_ = List.query.filter_by(id=list_id).first()
     return (
         jsonify(
             [list_.to_dict(args["offset"], args["limit"], args["start_today"])]
@@ -60,17 +64,30 @@ def get_list(list_id):
     )
 
 
+@bp.route("/lists/<list_id>/grid", methods=["GET"])
+@login_required
+@list_access_required
+@conditional
+@cached
+def get_grid(list_id, list_):
+    args = extract_args(request.args)
+    json_obj = list_.get_grid(
+        args["offset"], args["limit"], args["start_today"]
+    )
+    return jsonify(json_obj), 200
+
+
 @bp.route("/lists/<list_id>", methods=["PATCH"])
 @login_required
 @list_access_required
-def patch_list(list_id):
+def patch_list(list_id, list_):
     args = extract_args(request.args)
     req = request.get_json()
     if not req:
         raise APIError("application/json is required")
-    list_ = List.query.filter_by(id=list_id).first()
     if "listname" in req:
         list_.name = req["listname"]
+        list_.touch()
     db.session.commit()
     return (
         jsonify(
@@ -84,14 +101,11 @@ def patch_list(list_id):
 @login_required
 @list_owner_required
 @list_access_required
-def delete_list(list_id):
+def delete_list(list_id, list_):
     args = extract_args(request.args)
-    list_ = List.query.filter_by(id=list_id).first()
     db.session.delete(list_)
     db.session.commit()
-    lists = current_user.get_lists()
-    json_obj = [
-        l.to_dict(args["offset"], args["limit"], args["start_today"])
-        for l in lists
-    ]
+    json_obj = serialize_lists(
+        current_user, args["offset"], args["limit"], args["start_today"]
+    )
     return jsonify(json_obj), 200
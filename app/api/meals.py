@@ -1,63 +1,69 @@
 from flask import jsonify, request
-from app.models import List, Meal
+from app.models import Meal
 from app import db
 from app.api import bp
-from app.api.decorators import list_access_required, login_required
+from app.api.decorators import (
+    list_access_required,
+    login_required,
+    conditional,
+    cached,
+)
 from app.api.exceptions import APIError
+from app.service import read_models
+from app.service.meals import set_meals
 
 
 @bp.route("/lists/<list_id>/meals", methods=["GET"])
 @login_required
 @list_access_required
-def get_meals(list_id):
-    list_ = List.query.filter_by(id=list_id).first()
-    json_obj = [meal.to_dict() for meal in list_.get_or_create_meals()]
-    return jsonify(json_obj), 200
+@conditional
+@cached
+def get_meals(list_id, list_):
+    return jsonify(read_models.meals_json(list_)), 200
 
 
 @bp.route("/lists/<list_id>/meals/<meal_id>", methods=["DELETE"])
 @login_required
 @list_access_required
-def delete_meal(list_id, meal_id):
-    list_ = List.query.filter_by(id=list_id).first()
+def delete_meal(list_id, meal_id, list_):
     meal = Meal.query.filter_by(list_id=list_.id, id=meal_id).first()
     if not meal:
         raise APIError(f"No meal with id {meal_id} exists", 404)
     db.session.delete(meal)
+    list_.touch()
     db.session.commit()
-    json_obj = [meal.to_dict() for meal in list_.get_or_create_meals()]
+    json_obj = read_models.meals(list_)
     return jsonify(json_obj), 200
 
 
 @bp.route("/lists/<list_id>/meals/<meal_id>", methods=["PATCH"])
 @login_required
 @list_access_required
-def patch_meals(list_id, meal_id):
+def patch_meals(list_id, meal_id, list_):
     req = request.get_json()
     if not req:
         raise APIError("application/json is required")
     if "name" not in req:
         raise APIError("name is required")
-    list_ = List.query.filter_by(id=list_id).first()
     meal = Meal.query.filter_by(list_id=list_.id, id=meal_id).first()
     if not meal:
         raise APIError(f"No meal with id {meal_id} exists", 404)
     meal.name = req["name"]
+    list_.touch()
     db.session.commit()
-    json_obj = [meal.to_dict() for meal in list_.get_or_create_meals()]
+    json_obj = read_models.meals(list_)
     return jsonify(json_obj), 200
 
 
 @bp.route("/lists/<list_id>/meals", methods=["POST"])
 @login_required
 @list_access_required
-def post_meals(list_id):
+def post_meals(list_id, list_):
     req = request.get_json()
     if not req:
         raise APIError("application/json is required")
     if "name" not in req:
         raise APIError("name is required")
-    list_ = List.query.filter_by(id=list_id).first()
     if Meal.query.filter_by(name=req["name"], list_id=list_.id).first():
         raise APIError(f'Meal {req["name"]} already exists')
     try:
@@ -68,50 +74,49 @@ def post_meals(list_id):
         order = 1
     meal = Meal(list_id=list_.id, name=req["name"], order=order)
     db.session.add(meal)
+    list_.touch()
     db.session.commit()
-    json_obj = [meal.to_dict() for meal in list_.get_or_create_meals()]
+    json_obj = read_models.meals(list_)
     return jsonify(json_obj), 201
 
 
-def verify_meals(req, meals):
+def parse_meals(req, meal_ids):
+    """
+    Reads the meals sent to put_meals as (id or None, name), ids have to
+    be in meal_ids
+    """
+    wanted = []
     for meal in req:
-        if "id" in meal:
-            if meal["id"] not in [i.id for i in meals]:
-                raise APIError(
-                    "ID assignment not allowed, only include pre-existing IDs"
-                )
-            if "name" not in meal:
-                raise APIError(f"No name received in {meal}")
+        if not isinstance(meal, dict) or not meal.get("name"):
+            raise APIError(f"No name received in {meal}")
+        if "id" in meal and meal["id"] not in meal_ids:
+            raise APIError(
+                "ID assignment not allowed, only include pre-existing IDs"
+            )
+        wanted.append((meal.get("id"), meal["name"]))
+    ids = [meal_id for meal_id, _ in wanted if meal_id is not None]
+    if len(set(ids)) < len(ids):
+        raise APIError("Every meal can only be included once")
+    names = [name for _, name in wanted]
+    if len(set(names)) < len(names):
+        raise APIError("Every meal needs a different name")
+    return wanted
 
 
 @bp.route("/lists/<list_id>/meals", methods=["PUT"])
 @login_required
 @list_access_required
-def put_meals(list_id):
+def put_meals(list_id, list_):
     req = request.get_json()
     if not req:
         raise APIError("application/json is required")
     if not isinstance(req, list):
         raise APIError("A list of meals is required")
-    list_ = List.query.filter_by(id=list_id).first()
-    meals = Meal.query.filter_by(list_id=list_.id).all()
-    # verify integrity of received list
-    verify_meals(req, meals)
-    for meal in meals:
-        if meal.id not in [i["id"] for i in req if "id" in i]:
-            db.session.delete(meal)
-    db.session.commit()
-    meals = Meal.query.filter_by(list_id=list_.id).all()
-    for index, req_meal in enumerate(req):
-        if "id" in req_meal and req_meal["id"] in [i.id for i in meals]:
-            meals_index = [i.id for i in meals].index(req_meal["id"])
-            meals[meals_index].order = index
-            meals[meals_index].name = req_meal["name"]
-        else:
-            new_meal = Meal(
-                list_id=list_.id, name=req_meal["name"], order=index
-            )
-            db.session.add(new_meal)
+    meal_ids = {
+        i for i, in db.session.query(Meal.id).filter_by(list_id=list_.id)
+    }
+    set_meals(list_.id, parse_meals(req, meal_ids))
+    list_.touch()
     db.session.commit()
-    json_obj = [meal.to_dict() for meal in list_.get_or_create_meals()]
+    json_obj = read_models.meals(list_)
     return jsonify(json_obj)
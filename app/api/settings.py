@@ -1,7 +1,6 @@
 import calendar
 from flask import jsonify, request
 from flask_login import current_user
-from app.models import List
 from app import db
 from app.api import bp
 from app.api.decorators import list_access_required, login_required
@@ -12,14 +11,13 @@ from app.api.helpers import extract_args
 @bp.route("/lists/<list_id>/settings", methods=["PUT"])
 @login_required
 @list_access_required
-def put_list_settings(list_id):
+def put_list_settings(list_id, list_):
     args = extract_args(request.args)
 
     req = request.get_json()
     if not req:
         raise APIError("application/json is required")
 
-    list_ = List.query.filter_by(id=list_id).first()
     settings = list_.get_settings_for_user(current_user)
 
     if "start_day_of_week" not in req:
@@ -48,6 +46,7 @@ def put_list_settings(list_id):
     # set and commit
     settings.start_day_of_week = start_day_of_week
     settings.days_to_display = days_to_display
+    list_.touch()
     db.session.commit()
 
     return jsonify(
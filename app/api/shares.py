@@ -6,24 +6,25 @@ from app.api.decorators import (
     list_access_required,
     login_required,
     list_owner_required,
+    conditional,
 )
 from app.api.exceptions import APIError
+from app.service import read_models
 
 
 @bp.route("/lists/<list_id>/shares", methods=["GET"])
 @login_required
 @list_access_required
-def get_list_shares(list_id):
-    list_ = List.query.filter_by(id=list_id).first()
-    return jsonify([i.to_dict() for i in list_.users]), 200
+@conditional
+def get_list_shares(list_id, list_):
+    return jsonify(read_models.shares(list_.id)), 200
 
 
 @bp.route("/lists/<list_id>/shares", methods=["POST"])
 @login_required
 @list_access_required
 @list_owner_required
-def post_list_shares(list_id):
-    list_ = List.query.filter_by(id=list_id).first()
+def post_list_shares(list_id, list_):
     req = request.get_json()
     if not req:
         raise APIError("application/json is required")
@@ -40,21 +41,22 @@ def post_list_shares(list_id):
         user_id=user_.id, list_id=list_.id, permission_level="member"
     )
     db.session.add(new_perm)
+    list_.touch()
     db.session.commit()
-    return jsonify([i.to_dict() for i in list_.users]), 201
+    return jsonify(read_models.shares(list_.id)), 201
 
 
 @bp.route("/lists/<list_id>/shares/<share_id>", methods=["DELETE"])
 @login_required
 @list_access_required
 @list_owner_required
-def delete_share(list_id, share_id):
-    list_ = List.query.filter_by(id=list_id).first()
+def delete_share(list_id, share_id, list_):
     share = ListPermission.query.filter_by(
         id=share_id, list_id=list_id
     ).first()
     if not share:
         raise APIError(f"Share with id {share_id} not found", 404)
     db.session.delete(share)
+    list_.touch()
     db.session.commit()
-    return jsonify([i.to_dict() for i in list_.users]), 200
+    return jsonify(read_models.shares(list_.id)), 200
@@ -0,0 +1,260 @@
+import csv
+import io
+import json
+import time
+from flask import Response, jsonify, request, stream_with_context
+from app.models import Day, Entry, Meal
+from app import db
+from app.api import bp
+from app.api.decorators import list_access_required, login_required
+from app.api.exceptions import APIError
+from app.api.helpers import parse_day
+from app.service.bulk import insert_or_ignore
+from app.service import meal_schema
+from app.service.foods import import_foods
+
+EXPORT_FORMATS = {"ndjson": "application/x-ndjson", "csv": "text/csv"}
+CSV_COLUMNS = ["date", "meal", "value", "meal_id", "id"]
+CHUNK_SIZE = 1000
+MAX_REPORTED_ERRORS = 100
+
+
+def export_query(list_, args):
+    """
+    Returns every stored entry of list_ as (day, meal_id, meal, id, value)
+    in date and meal order, filtered by the from, to and meal_id arguments
+    """
+    query = (
+        db.session.query(Day.day, Meal.id, Meal.name, Entry.id, Entry.value)
+        .select_from(Entry)
+        .join(Day, Entry.day_id == Day.id)
+        .join(Meal, Entry.meal_id == Meal.id)
+        .filter(Day.list_id == list_.id)
+    )
+    if "from" in args:
+        query = query.filter(Day.day >= parse_day(args["from"]))
+    if "to" in args:
+        query = query.filter(Day.day <= parse_day(args["to"]))
+    if "meal_id" in args:
+        try:
+            meal_ids = [
+                int(i)
+                for arg in args.getlist("meal_id")
+                for i in arg.split(",")
+            ]
+        except ValueError:
+            raise APIError("meal_id needs to be a number")
+        query = query.filter(Meal.id.in_(meal_ids))
+    return (
+        query.order_by(Day.day, Meal.order)
+        .execution_options(stream_results=True)
+        .yield_per(CHUNK_SIZE)
+    )
+
+
+def to_ndjson(rows):
+    lines = []
+    for day, meal_id, meal, entry_id, value in rows:
+        lines.append(
+            json.dumps(
+                {
+                    "type": "entry",
+                    "date": day.isoformat(),
+                    "meal": meal,
+                    "value": value,
+                    "meal_id": meal_id,
+                    "id": entry_id,
+                }
+            )
+            + "\n"
+        )
+        if len(lines) == CHUNK_SIZE:
+            yield "".join(lines)
+            lines = []
+    if lines:
+        yield "".join(lines)
+
+
+def to_csv(rows):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(CSV_COLUMNS)
+    for idx, (day, meal_id, meal, entry_id, value) in enumerate(rows, 1):
+        writer.writerow([day.isoformat(), meal, value, meal_id, entry_id])
+        if idx % CHUNK_SIZE == 0:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue()
+
+
+@bp.route("/lists/<list_id>/export", methods=["GET"])
+@login_required
+@list_access_required
+def export_list(list_id, list_):
+    format_ = request.args.get("format", "ndjson")
+    if format_ not in EXPORT_FORMATS:
+        raise APIError(
+            f'format needs to be one of {", ".join(EXPORT_FORMATS)}'
+        )
+    rows = export_query(list_, request.args)
+    body = to_ndjson(rows) if format_ == "ndjson" else to_csv(rows)
+    return Response(
+        stream_with_context(body),
+        mimetype=EXPORT_FORMATS[format_],
+        headers={
+            "Content-Disposition": (
+                f"attachment; filename=list-{list_.id}.{format_}"
+            )
+        },
+    )
+
+
+def read_rows(stream, format_):
+    """
+    Parses the body line by line and yields (line number, row) where row
+    is a dict, or None if the line could not be parsed
+    """
+    text = io.TextIOWrapper(stream, encoding="utf-8-sig", errors="replace")
+    if format_ == "csv":
+        reader = csv.DictReader(text)
+        for row in reader:
+            yield reader.line_num, row
+        return
+    for line_num, line in enumerate(text, 1):
+        if not line.strip():
+            continue
+        try:
+            row = json.loads(line)
+        except ValueError:
+            row = None
+        yield line_num, row if isinstance(row, dict) else None
+
+
+def split_names(value):
+    """Reads categories or ingredients as a list or ; separated in csv"""
+    if not value:
+        return []
+    if isinstance(value, str):
+        value = value.split(";")
+    if not isinstance(value, list):
+        raise APIError(f"Expected a list of names, got {value}")
+    return [str(i).strip() for i in value if str(i).strip()]
+
+
+def parse_import_row(row):
+    """
+    Returns ("entry", (day, meal, value)) or
+    ("food", (name, categories, ingredients)), rows without a type are
+    entries if they have a date
+    """
+    if row is None:
+        raise APIError("Could not parse row")
+    kind = row.get("type") or ("entry" if row.get("date") else "food")
+    if kind == "entry":
+        meal = str(row.get("meal") or "").strip()
+        value = row.get("value") or ""
+        if not meal:
+            raise APIError("meal is required")
+        if not isinstance(value, str) or len(value) > 256:
+            raise APIError("value needs to be text of at most 256 characters")
+        return kind, (parse_day(row.get("date")), meal, value)
+    if kind == "food":
+        name = str(row.get("name") or "").strip()
+        if not name or len(name) > 250:
+            raise APIError("name needs to be 1 to 250 characters")
+        categories = split_names(row.get("categories"))
+        ingredients = split_names(row.get("ingredients"))
+        return kind, (name, categories, ingredients)
+    raise APIError(f"Unknown type {kind}")
+
+
+def import_chunk(list_, meals, entries, foods):
+    """
+    Writes one chunk of parsed rows, creating missing meals, days and
+    entries, and commits it
+    """
+    new_meals = list(dict.fromkeys(m for _, m, _ in entries if m not in meals))
+    if new_meals:
+        order = max((o for _, o in meals.values()), default=-1) + 1
+        insert_or_ignore(
+            Meal,
+            [
+                {"list_id": list_.id, "name": name, "order": order + idx}
+                for idx, name in enumerate(new_meals)
+            ],
+        )
+        meal_schema.forget(list_.id)
+        meals.update(
+            {
+                m.name: (m.id, m.order)
+                for m in Meal.query.filter(
+                    Meal.list_id == list_.id, Meal.name.in_(new_meals)
+                )
+            }
+        )
+    values = {(day, meals[meal][0]): value for day, meal, value in entries}
+    entry_ids = list_.get_or_create_entry_ids(values.keys())
+    Entry.update_values({entry_ids[c]: v for c, v in values.items()})
+    if foods:
+        import_foods(list_.id, foods)
+    db.session.commit()
+
+
+@bp.route("/lists/<list_id>/import", methods=["POST"])
+@login_required
+@list_access_required
+def import_list(list_id, list_):
+    format_ = request.args.get("format") or (
+        "csv" if request.mimetype == "text/csv" else "ndjson"
+    )
+    if format_ not in EXPORT_FORMATS:
+        raise APIError(
+            f'format needs to be one of {", ".join(EXPORT_FORMATS)}'
+        )
+    start = time.perf_counter()
+    meals = {
+        m.name: (m.id, m.order) for m in Meal.query.filter_by(list_id=list_.id)
+    }
+    counts = {"rows": 0, "entries": 0, "foods": 0, "errors": 0}
+    errors = []
+    entries = []
+    foods = []
+    for line_num, row in read_rows(request.stream, format_):
+        counts["rows"] += 1
+        try:
+            kind, parsed = parse_import_row(row)
+        except APIError as e:
+            counts["errors"] += 1
+            if len(errors) < MAX_REPORTED_ERRORS:
+                errors.append({"line": line_num, "message": e.message})
+            continue
+        if kind == "entry":
+            entries.append(parsed)
+            counts["entries"] += 1
+        else:
+            foods.append(parsed)
+            counts["foods"] += 1
+        if len(entries) + len(foods) >= CHUNK_SIZE:
+            import_chunk(list_, meals, entries, foods)
+            entries, foods = [], []
+    if entries or foods:
+        import_chunk(list_, meals, entries, foods)
+    if counts["entries"] or counts["foods"]:
+        if counts["foods"]:
+            list_.touch_foods()
+        else:
+            list_.touch()
+        db.session.commit()
+    seconds = time.perf_counter() - start
+    return (
+        jsonify(
+            {
+                **counts,
+                "seconds": round(seconds, 3),
+                "rows_per_second": round(counts["rows"] / seconds, 1),
+                "error_details": errors,
+            }
+        ),
+        200,
+    )
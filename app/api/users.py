@@ -1,18 +1,17 @@
 from flask import jsonify, request
 from flask_login import login_user, current_user, logout_user
-from app.models import User
+from app.models import User, List
 from app import db
 from app.api import bp
 from app.api.decorators import login_required
 from app.api.exceptions import APIError
+from app.service import read_models
 
 
 @bp.route("/users", methods=["GET"])
 @login_required
 def get_users():
-    users = User.query.all()
-    users = [i.to_dict() for i in users]
-    return jsonify(users), 200
+    return jsonify(read_models.users(current_user.id)), 200
 
 
 def verify_mandatory_user_fields(req):
@@ -68,6 +67,8 @@ def delete_user(user_id):
         raise APIError(f"No user with id {user_id}", 404)
     if user_ != current_user:
         raise APIError("You cannot delete another user", 403)
+    # the shares of every list of the user change
+    List.touch_ids([i.list_id for i in user_.lists])
     db.session.delete(user_)
     db.session.commit()
     logout_user()
@@ -107,6 +108,8 @@ def put_users(user_id):
     # send_user_confirmation_email(u, confirm_url)
     current_user.firstname = req["firstname"]
     current_user.lastname = req["lastname"]
+    # lists show the names of the users they are shared with
+    List.touch_ids([i.list_id for i in current_user.lists])
     db.session.commit()
     return (
         jsonify(
@@ -1,13 +1,21 @@
+from collections import namedtuple
 from time import time
-from datetime import date, timedelta
+from datetime import date, datetime, timedelta
 from os import urandom
 from binascii import b2a_hex
 from werkzeug.security import generate_password_hash, check_password_hash
 from flask_login import UserMixin, current_user
 import jwt
+from sqlalchemy import event
 from sqlalchemy.exc import IntegrityError
 from flask import current_app
 from app import db, login
+from app.service.bulk import insert_or_ignore
+from app.service.metrics import count_created
+from app.service import meal_schema
+from app.service.request_cache import memoize
+
+FOOD_CHANGES_MAX_AGE = timedelta(days=1)
 
 
 @login.user_loader
@@ -20,8 +28,10 @@ class User(UserMixin, db.Model):
 
     __tablename__ = "user"
     id = db.Column(db.Integer, primary_key=True)
-    username = db.Column(db.String(250), nullable=False)
-    email = db.Column(db.String(250), nullable=False)
+    username = db.Column(
+        db.String(250), nullable=False, unique=True, index=True
+    )
+    email = db.Column(db.String(250), nullable=False, unique=True, index=True)
     firstname = db.Column(db.String(250))
     lastname = db.Column(db.String(250))
     password = db.Column(db.String(250))
@@ -76,7 +86,7 @@ class List(db.Model):
     """
     A list containst days, settings, and other related items
 
-    Takes name (apikey, last_updated)
+    Takes name (apikey, last_updated, foods_updated)
     """
 
     __tablename__ = "list"
@@ -84,6 +94,7 @@ class List(db.Model):
     name = db.Column(db.String(250), nullable=False)
     apikey = db.Column(db.String(250))
     last_updated = db.Column(db.DateTime)
+    foods_updated = db.Column(db.DateTime)
 
     # backref users -> ListPermission (assoc table)
 
@@ -102,6 +113,26 @@ class List(db.Model):
         self.apikey = str(b2a_hex(urandom(16)), "utf-8")
         return self.apikey
 
+    def touch(self):
+        """Records a change to the list, which invalidates its ETags"""
+        self.last_updated = datetime.utcnow()
+
+    def touch_foods(self):
+        """
+        Records a change to the names of the list's foods, which also
+        invalidates its food search indexes
+        """
+        self.touch()
+        self.foods_updated = self.last_updated
+
+    @staticmethod
+    def touch_ids(list_ids):
+        if list_ids:
+            List.query.filter(List.id.in_(list_ids)).update(
+                {List.last_updated: datetime.utcnow()},
+                synchronize_session=False,
+            )
+
     def get_users_with_access(self):
         return [i.user for i in self.users]
 
@@ -111,32 +142,124 @@ class List(db.Model):
     def get_owners(self):
         return [i.user for i in self.users if i.permission_level == "owner"]
 
-    def get_or_create_days(self, offset=0, limit=None, start_today=False):
+    def get_date_range(
+        self, offset=0, limit=None, start_today=False, list_settings=None
+    ):
+        """Returns the first and last date of the requested window"""
+        if list_settings is None:
+            list_settings = self.get_settings_for_user(current_user)
+        return List.get_window(list_settings, offset, limit, start_today)
+
+    @staticmethod
+    def get_window(list_settings, offset=0, limit=None, start_today=False):
         now = date.today()
-        list_settings = self.get_settings_for_user(current_user)
-        days = []
         days_to_display = limit if limit else list_settings.days_to_display
-        start_day = 0 if start_today else self.get_start_day()
-        end_day = start_day + days_to_display + (offset * days_to_display)
+        start_day = 0 if start_today else List._start_day(list_settings)
         start_day += offset * days_to_display
-        for i in range(start_day, end_day):
-            delta = timedelta(days=i)
-            day = Day.query.filter_by(day=now + delta, list_id=self.id).first()
-            if not day:
-                day = Day(list_id=self.id, day=now + delta)
-                try:
-                    db.session.add(day)
-                    db.session.commit()
-                except IntegrityError:
-                    db.session.rollback()
-                    # IT'S BEEN CREATED
-                    day = Day.query.filter_by(
-                        day=now + delta, list_id=self.id
-                    ).first()
-            days.append(day)
-        return days
+        first = now + timedelta(days=start_day)
+        last = first + timedelta(days=days_to_display - 1)
+        return first, last
+
+    def get_or_create_days(
+        self, offset=0, limit=None, start_today=False, list_settings=None
+    ):
+        window = self.get_date_range(offset, limit, start_today, list_settings)
+        return List.get_or_create_days_for_windows({self.id: window})[self.id]
+
+    def get_days(
+        self, offset=0, limit=None, start_today=False, list_settings=None
+    ):
+        """
+        Returns the days of the requested window, in virtual mode
+        without writing to the database
+        """
+        if current_app.config.get("VIRTUAL_DAYS"):
+            return self.get_virtual_days(
+                offset, limit, start_today, list_settings
+            )
+        return self.get_or_create_days(
+            offset, limit, start_today, list_settings
+        )
+
+    def get_virtual_days(
+        self, offset=0, limit=None, start_today=False, list_settings=None
+    ):
+        window = self.get_date_range(offset, limit, start_today, list_settings)
+        return List.get_virtual_days_for_windows({self.id: window})[self.id]
+
+    @staticmethod
+    def get_or_create_days_for_windows(windows):
+        """
+        Takes a dict of list_id -> (first, last) and returns a dict of
+        list_id -> ordered days, inserting every missing day in one statement
+        """
+        stored = List._query_windows(windows)
+        missing = [
+            {"list_id": list_id, "day": d}
+            for list_id, window in windows.items()
+            for d in List._dates_in(window)
+            if d not in stored[list_id]
+        ]
+        if missing:
+            # concurrent requests may have created some of these already
+            created = insert_or_ignore(Day, missing)
+            db.session.commit()
+            count_created(Day.__tablename__, created)
+            stored = List._query_windows(windows)
+        return {
+            list_id: [stored[list_id][d] for d in List._dates_in(window)]
+            for list_id, window in windows.items()
+        }
+
+    @staticmethod
+    def get_virtual_days_for_windows(windows):
+        stored = List._query_windows(windows)
+        return {
+            list_id: [
+                stored[list_id].get(d)
+                or VirtualDay(List.query.get(list_id), d)
+                for d in List._dates_in(window)
+            ]
+            for list_id, window in windows.items()
+        }
+
+    @staticmethod
+    def _dates_in(window):
+        first, last = window
+        return [
+            first + timedelta(days=i) for i in range((last - first).days + 1)
+        ]
+
+    @staticmethod
+    def _query_windows(windows):
+        """Loads the stored days of all windows in one range query"""
+        stored = {list_id: {} for list_id in windows}
+        if not windows:
+            return stored
+        days = Day.query.filter(
+            db.or_(
+                *[
+                    db.and_(
+                        Day.list_id == list_id,
+                        Day.day >= first,
+                        Day.day <= last,
+                    )
+                    for list_id, (first, last) in windows.items()
+                ]
+            )
+        ).all()
+        for d in days:
+            stored[d.list_id][d.day] = d
+        return stored
 
     def get_settings_for_user(self, user):
+        return memoize(
+            "settings",
+            (self.id, user.id),
+            lambda: self._get_or_create_settings(user),
+        )
+
+    def _get_or_create_settings(self, user):
         settings = ListSettings.query.filter_by(
             list_id=self.id, user_id=user.id
         ).first()
@@ -146,22 +269,281 @@ class List(db.Model):
             )
             db.session.add(settings)
             db.session.commit()
+            count_created(ListSettings.__tablename__, 1)
         return settings
 
     def get_or_create_meals(self):
-        if not Meal.query.filter_by(list_id=self.id).first():
-            for idx, i in enumerate(["Lunch", "Dinner"]):
-                meal = Meal(list_id=self.id, name=i, order=idx)
-                try:
-                    db.session.add(meal)
-                    db.session.commit()
-                except IntegrityError:
-                    db.session.rollback()
-        return sorted(self.meals, key=lambda x: x.order)
-
-    def to_dict(self, offset=0, limit=None, start_today=False):
-        list_settings = self.get_settings_for_user(current_user)
-        days = self.get_or_create_days(offset, limit, start_today)
+        """
+        Returns the meals of the list in display order as a tuple of
+        MealInfo, see get_meal_schemas
+        """
+        return List.get_meal_schemas({self.id: self.last_updated})[self.id]
+
+    @staticmethod
+    def get_meal_schemas(versions):
+        """
+        Takes a dict of list id -> last_updated and returns a dict of list
+        id -> the meals of the list in display order as a tuple of
+        MealInfo, giving lists without meals the default ones
+
+        Schemas are kept per process until the list's last_updated changes
+        or its meals are written, the rest are loaded with one query
+        """
+        schemas = meal_schema.lookup(versions)
+        missing = [i for i in versions if i not in schemas]
+        if not missing:
+            return schemas
+        loaded = List._query_meal_schemas(missing)
+        without_meals = [i for i in missing if not loaded[i]]
+        if without_meals:
+            created = insert_or_ignore(
+                Meal,
+                [
+                    {"list_id": list_id, "name": name, "order": idx}
+                    for list_id in without_meals
+                    for idx, name in enumerate(["Lunch", "Dinner"])
+                ],
+            )
+            if created:
+                db.session.commit()
+                count_created(Meal.__tablename__, created)
+            loaded.update(List._query_meal_schemas(without_meals))
+        meal_schema.store(versions, loaded)
+        schemas.update(loaded)
+        return schemas
+
+    @staticmethod
+    def _query_meal_schemas(list_ids):
+        rows = (
+            db.session.query(Meal.list_id, Meal.id, Meal.name, Meal.order)
+            .filter(Meal.list_id.in_(list_ids))
+            .order_by(Meal.list_id, Meal.order, Meal.id)
+        )
+        meals = {list_id: [] for list_id in list_ids}
+        for list_id, *meal in rows:
+            meals[list_id].append(MealInfo(*meal))
+        return {list_id: tuple(m) for list_id, m in meals.items()}
+
+    def get_or_create_entries(self, days):
+        """
+        Returns the entries of every day in days, one list per day
+        ordered by meal, creating the missing ones in a single insert
+        """
+        day_ids = [d.id for d in days]
+        if not day_ids:
+            return []
+        meal_ids = [m.id for m in self.get_or_create_meals()]
+        entries = self._query_entries(day_ids)
+        if List._create_missing_entries(day_ids, meal_ids, entries):
+            entries = self._query_entries(day_ids)
+        by_cell = {(e.day_id, e.meal_id): e for e in entries}
+        return [
+            [by_cell[(day_id, meal_id)] for meal_id in meal_ids]
+            for day_id in day_ids
+        ]
+
+    def get_entries(self, days):
+        """
+        Returns the entries of every day in days for the listings, one list
+        per day ordered by meal, as EntryRow read with one joined query
+        that loads only the columns serialized
+
+        Missing entries are created, in virtual mode they are filled in
+        with VirtualEntry without writing to the database
+        """
+        meals = self.get_or_create_meals()
+        # committing below expires the days, read them first
+        cells = [(d.id if isinstance(d, Day) else None, d.day) for d in days]
+        day_ids = [day_id for day_id, _ in cells if day_id]
+        rows = self._query_entry_rows(day_ids)
+        if not current_app.config.get("VIRTUAL_DAYS"):
+            meal_ids = [m.id for m in meals]
+            if List._create_missing_entries(day_ids, meal_ids, rows):
+                rows = self._query_entry_rows(day_ids)
+        by_cell = {(r.day_id, r.meal_id): r for r in rows}
+        return [
+            [
+                by_cell.get((day_id, meal.id)) or VirtualEntry(self, day, meal)
+                for meal in meals
+            ]
+            for day_id, day in cells
+        ]
+
+    @staticmethod
+    def _create_missing_entries(day_ids, meal_ids, entries):
+        """
+        Inserts the entries of day_ids and meal_ids that are not in entries
+        with one statement and commits, returns whether any were missing
+        """
+        existing = {(e.day_id, e.meal_id) for e in entries}
+        missing = [
+            {"day_id": day_id, "meal_id": meal_id, "value": ""}
+            for day_id in day_ids
+            for meal_id in meal_ids
+            if (day_id, meal_id) not in existing
+        ]
+        if missing:
+            created = insert_or_ignore(Entry, missing)
+            db.session.commit()
+            count_created(Entry.__tablename__, created)
+        return bool(missing)
+
+    def find_entry(self, day, meal_id):
+        return (
+            Entry.query.join(Day)
+            .filter(
+                Day.list_id == self.id,
+                Day.day == day,
+                Entry.meal_id == meal_id,
+            )
+            .first()
+        )
+
+    def get_or_create_entry(self, day, meal_id):
+        """Returns the stored entry for a day and meal, creating it if needed"""
+        insert_or_ignore(Day, [{"list_id": self.id, "day": day}])
+        day_id = (
+            db.session.query(Day.id)
+            .filter_by(list_id=self.id, day=day)
+            .scalar()
+        )
+        insert_or_ignore(
+            Entry, [{"day_id": day_id, "meal_id": meal_id, "value": ""}]
+        )
+        return Entry.query.filter_by(day_id=day_id, meal_id=meal_id).first()
+
+    def get_grid(self, offset=0, limit=None, start_today=False):
+        """
+        Returns the window as columns: dates, meals and a values and an
+        ids matrix with one row per date and one column per meal
+
+        Meals and the stored entries of the window come from one query,
+        cells without a stored entry get virtual ids and nothing is written
+        """
+        first, last = self.get_date_range(offset, limit, start_today)
+        entries = db.join(Entry, Day, Entry.day_id == Day.id)
+        rows = (
+            db.session.query(
+                Meal.id, Meal.name, Meal.order, Day.day, Entry.id, Entry.value
+            )
+            .select_from(Meal)
+            .outerjoin(
+                entries,
+                db.and_(
+                    Entry.meal_id == Meal.id,
+                    Day.list_id == self.id,
+                    Day.day >= first,
+                    Day.day <= last,
+                ),
+            )
+            .filter(Meal.list_id == self.id)
+            .all()
+        )
+        if not rows:
+            rows = [
+                (m.id, m.name, m.order, None, None, None)
+                for m in self.get_or_create_meals()
+            ]
+        meals = sorted({(order, i, name) for i, name, order, *_ in rows})
+        stored = {
+            (day, meal_id): (entry_id, value)
+            for meal_id, _, _, day, entry_id, value in rows
+            if day
+        }
+        dates = List._dates_in((first, last))
+        grid = [
+            [stored.get((d, meal_id)) for _, meal_id, _ in meals]
+            for d in dates
+        ]
+        return {
+            "dates": [d.isoformat() for d in dates],
+            "meals": [{"id": i, "name": name} for _, i, name in meals],
+            "values": [[c[1] if c else "" for c in row] for row in grid],
+            "ids": [
+                [
+                    c[0] if c else VirtualEntry.make_id(self.id, d, meal[1])
+                    for c, meal in zip(row, meals)
+                ]
+                for d, row in zip(dates, grid)
+            ],
+        }
+
+    def find_entry_ids(self, cells):
+        """
+        Takes (day, meal_id) pairs and returns a dict of
+        (day, meal_id) -> entry id for those that are stored
+        """
+        if not cells:
+            return {}
+        days = {day for day, _ in cells}
+        rows = (
+            db.session.query(Day.day, Entry.meal_id, Entry.id)
+            .join(Entry, Entry.day_id == Day.id)
+            .filter(Day.list_id == self.id, Day.day.in_(days))
+            .all()
+        )
+        return {
+            (day, meal_id): entry_id
+            for day, meal_id, entry_id in rows
+            if (day, meal_id) in cells
+        }
+
+    def get_or_create_entry_ids(self, cells):
+        """
+        Like find_entry_ids, creating the missing days and entries first
+        with one insert each, without committing
+        """
+        found = self.find_entry_ids(cells)
+        missing = [cell for cell in cells if cell not in found]
+        if not missing:
+            return found
+        days = {day for day, _ in missing}
+        insert_or_ignore(Day, [{"list_id": self.id, "day": d} for d in days])
+        day_ids = dict(
+            db.session.query(Day.day, Day.id).filter(
+                Day.list_id == self.id, Day.day.in_(days)
+            )
+        )
+        insert_or_ignore(
+            Entry,
+            [
+                {"day_id": day_ids[day], "meal_id": meal_id, "value": ""}
+                for day, meal_id in missing
+            ],
+        )
+        return self.find_entry_ids(cells)
+
+    @staticmethod
+    def _query_entry_rows(day_ids):
+        if not day_ids:
+            return []
+        rows = (
+            db.session.query(
+                Entry.id, Entry.day_id, Entry.meal_id, Meal.name, Entry.value
+            )
+            .join(Meal, Entry.meal_id == Meal.id)
+            .filter(Entry.day_id.in_(day_ids))
+        )
+        return [EntryRow(*row) for row in rows]
+
+    @staticmethod
+    def _query_entries(day_ids):
+        return Entry.query.filter(
+            Entry.day_id.in_(day_ids), Entry.meal_id.isnot(None)
+        ).all()
+
+    def to_dict(
+        self,
+        offset=0,
+        limit=None,
+        start_today=False,
+        list_settings=None,
+        days=None,
+    ):
+        if list_settings is None:
+            list_settings = self.get_settings_for_user(current_user)
+        if days is None:
+            days = self.get_days(offset, limit, start_today, list_settings)
         listdict = {
             "name": self.name,
             "id": self.id,
@@ -173,7 +555,10 @@ class List(db.Model):
                 "days_to_display": list_settings.days_to_display,
             },
             "shares": [i.id for i in self.users],
-            "is_owner": current_user in self.get_owners(),
+            "is_owner": any(
+                i.user_id == current_user.id and i.permission_level == "owner"
+                for i in self.users
+            ),
             "meals": [i.id for i in self.get_or_create_meals()],
             "foods": [i.id for i in self.foods],
             "categories": [i.id for i in self.categories],
@@ -204,8 +589,13 @@ class List(db.Model):
         ]
         return days[int_]
 
-    def get_start_day(self):
-        list_settings = self.get_settings_for_user(current_user)
+    def get_start_day(self, list_settings=None):
+        if list_settings is None:
+            list_settings = self.get_settings_for_user(current_user)
+        return List._start_day(list_settings)
+
+    @staticmethod
+    def _start_day(list_settings):
         if list_settings.start_day_of_week != -1:
             d = List.get_previous_of_weekday(list_settings.start_day_of_week)
         else:
@@ -224,13 +614,22 @@ class FoodCategory(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(250), nullable=False)
 
+    __table_args__ = (
+        db.Index(
+            "ix_foodcategories_list_id_name", "list_id", "name", unique=True
+        ),
+    )
+
     list_id = db.Column(
         db.Integer,
         db.ForeignKey("list.id", ondelete="CASCADE"),
         nullable=False,
     )
     list_ = db.relationship(
-        "List", backref=db.backref("categories", passive_deletes=True)
+        "List",
+        backref=db.backref(
+            "categories", passive_deletes=True, order_by="FoodCategory.id"
+        ),
     )
 
     def __repr__(self):
@@ -250,6 +649,15 @@ class FoodCategoryAssociation(db.Model):
     __tablename__ = "foodcategoryassociation"
     id = db.Column(db.Integer, primary_key=True)
 
+    __table_args__ = (
+        db.Index(
+            "ix_foodcategoryassociation_food_id_category_id",
+            "food_id",
+            "category_id",
+            unique=True,
+        ),
+    )
+
     food_id = db.Column(
         db.Integer,
         db.ForeignKey("foods.id", ondelete="CASCADE"),
@@ -257,17 +665,28 @@ class FoodCategoryAssociation(db.Model):
     )
     foods = db.relationship(
         "Food",
-        backref=db.backref("categories", cascade="all", passive_deletes=True),
+        backref=db.backref(
+            "categories",
+            cascade="all",
+            passive_deletes=True,
+            order_by="FoodCategoryAssociation.id",
+        ),
     )
 
     category_id = db.Column(
         db.Integer,
         db.ForeignKey("foodcategories.id", ondelete="CASCADE"),
         nullable=False,
+        index=True,
     )
     category = db.relationship(
         "FoodCategory",
-        backref=db.backref("foods", cascade="all", passive_deletes=True),
+        backref=db.backref(
+            "foods",
+            cascade="all",
+            passive_deletes=True,
+            order_by="FoodCategoryAssociation.id",
+        ),
     )
 
 
@@ -282,13 +701,18 @@ class Food(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(250), nullable=False)
 
+    __table_args__ = (
+        db.Index("ix_foods_list_id_name", "list_id", "name", unique=True),
+    )
+
     list_id = db.Column(
         db.Integer,
         db.ForeignKey("list.id", ondelete="CASCADE"),
         nullable=False,
     )
     list_ = db.relationship(
-        "List", backref=db.backref("foods", passive_deletes=True)
+        "List",
+        backref=db.backref("foods", passive_deletes=True, order_by="Food.id"),
     )
 
     # backref ingredients -> Ingredient
@@ -302,10 +726,89 @@ class Food(db.Model):
         return {
             "id": self.id,
             "name": self.name,
-            "categories": [i.category.id for i in self.categories],
+            "categories": [i.category_id for i in self.categories],
         }
 
 
+@event.listens_for(Food, "after_insert")
+@event.listens_for(Food, "after_update")
+def log_food_name(mapper, connection, food):
+    if db.inspect(food).attrs.name.history.has_changes():
+        FoodChange.log(food.list_id, {food.id: food.name}, connection)
+
+
+@event.listens_for(Food, "after_delete")
+def log_food_deleted(mapper, connection, food):
+    FoodChange.log(food.list_id, {food.id: None}, connection)
+
+
+class FoodChange(db.Model):
+    """
+    A food that was created, renamed or deleted, food search indexes
+    read these to catch up without reloading the catalogue. Changes are
+    kept for FOOD_CHANGES_MAX_AGE
+
+    Takes list_id, food_id, name, None for deleted foods, and changed_at
+    """
+
+    __tablename__ = "foodchanges"
+    id = db.Column(db.Integer, primary_key=True)
+    food_id = db.Column(db.Integer, nullable=False)
+    name = db.Column(db.String(250))
+    changed_at = db.Column(db.DateTime, nullable=False)
+
+    __table_args__ = (
+        db.Index("ix_foodchanges_list_id_changed_at", "list_id", "changed_at"),
+    )
+
+    list_id = db.Column(
+        db.Integer,
+        db.ForeignKey("list.id", ondelete="CASCADE"),
+        nullable=False,
+    )
+
+    @staticmethod
+    def log(list_id, changes, connection=None):
+        """
+        Takes a dict of food id -> new name, None for deleted foods, and
+        drops the changes of the list older than FOOD_CHANGES_MAX_AGE
+        """
+        if not changes:
+            return
+        now = datetime.utcnow()
+        table = FoodChange.__table__
+        execute = (connection or db.session).execute
+        execute(
+            table.insert(),
+            [
+                {
+                    "list_id": list_id,
+                    "food_id": food_id,
+                    "name": name,
+                    "changed_at": now,
+                }
+                for food_id, name in changes.items()
+            ],
+        )
+        execute(
+            table.delete().where(
+                db.and_(
+                    table.c.list_id == list_id,
+                    table.c.changed_at < now - FOOD_CHANGES_MAX_AGE,
+                )
+            )
+        )
+
+
+class MealInfo(namedtuple("MealInfo", ["id", "name", "order"])):
+    """The columns of a Meal that reads need, see List.get_meal_schemas"""
+
+    __slots__ = ()
+
+    def to_dict(self):
+        return {"id": self.id, "name": self.name}
+
+
 class Meal(db.Model):
     """
     This is a meal, there will be one entry per meal per day
@@ -338,6 +841,13 @@ class Meal(db.Model):
         return {"id": self.id, "name": self.name}
 
 
+@event.listens_for(Meal, "after_insert")
+@event.listens_for(Meal, "after_update")
+@event.listens_for(Meal, "after_delete")
+def forget_meal_schema(mapper, connection, meal):
+    meal_schema.forget(meal.list_id)
+
+
 class Ingredient(db.Model):
     """
     Foods contain ingredients
@@ -350,7 +860,7 @@ class Ingredient(db.Model):
     name = db.Column(db.String(250))
 
     food_id = db.Column(
-        db.Integer, db.ForeignKey("foods.id", ondelete="CASCADE")
+        db.Integer, db.ForeignKey("foods.id", ondelete="CASCADE"), index=True
     )
     food = db.relationship(
         "Food", backref=db.backref("ingredients", passive_deletes=True)
@@ -373,6 +883,15 @@ class ListSettings(db.Model):
     start_day_of_week = db.Column(db.Integer, default=-1)
     days_to_display = db.Column(db.Integer, default=7)
 
+    __table_args__ = (
+        db.Index(
+            "ix_listsettings_list_id_user_id",
+            "list_id",
+            "user_id",
+            unique=True,
+        ),
+    )
+
     list_id = db.Column(
         db.Integer,
         db.ForeignKey("list.id", ondelete="CASCADE"),
@@ -427,32 +946,106 @@ class Day(db.Model):
         return "<Day {} of List {}>".format(self.day, self.list_.name)
 
     def get_or_create_entries(self):
-        meals = sorted(self.list_.get_or_create_meals(), key=lambda x: x.order)
-        entries = []
-        entry_names = [i for i in meals]
-        for i in entry_names:
-            entry = Entry.query.filter_by(day_id=self.id, meal_id=i.id).first()
-            if not entry:
-                entry = Entry(day_id=self.id, value="", meal_id=i.id)
-                try:
-                    db.session.add(entry)
-                    db.session.commit()
-                except IntegrityError:
-                    db.session.rollback()
-                    entry = Entry.query.filter_by(
-                        day_id=self.id, meal_id=i.id
-                    ).first()
-            entries.append(entry)
-        return entries
+        return self.list_.get_or_create_entries([self])[0]
 
-    def to_dict(self):
+    def to_dict(self, entries=None):
+        if entries is None:
+            entries = self.list_.get_entries([self])[0]
+        return {
+            "day": self.day.isoformat(),
+            "id": self.id,
+            "entries": [e.id for e in entries],
+        }
+
+
+class VirtualDay:
+    """
+    A day without a stored row, built in memory on read
+
+    Its id is derived from the list and the date so clients can
+    still address it
+    """
+
+    def __init__(self, list_, day):
+        self.list_ = list_
+        self.list_id = list_.id
+        self.day = day
+        self.id = VirtualDay.make_id(list_.id, day)
+
+    def __repr__(self):
+        return "<VirtualDay {} of List {}>".format(self.day, self.list_.name)
+
+    @staticmethod
+    def make_id(list_id, day):
+        return "{}-{}".format(list_id, day.strftime("%Y%m%d"))
+
+    def to_dict(self, entries=None):
+        if entries is None:
+            entries = self.list_.get_entries([self])[0]
         return {
             "day": self.day.isoformat(),
             "id": self.id,
-            "entries": [e.id for e in self.get_or_create_entries()],
+            "entries": [e.id for e in entries],
         }
 
 
+class VirtualEntry:
+    """
+    An empty entry without a stored row, built in memory on read
+
+    The row is only created once a non-empty value is written to it
+    """
+
+    value = ""
+
+    def __init__(self, list_, day, meal):
+        self.list_id = list_.id
+        self.day = day
+        self.meal = meal
+        self.meal_id = meal.id
+        self.id = VirtualEntry.make_id(list_.id, day, meal.id)
+
+    def __repr__(self):
+        return "<VirtualEntry {}>".format(self.id)
+
+    @staticmethod
+    def make_id(list_id, day, meal_id):
+        return "{}-{}".format(VirtualDay.make_id(list_id, day), meal_id)
+
+    @staticmethod
+    def parse_id(entry_id):
+        """
+        Returns (list_id, day, meal_id) for a virtual entry id,
+        or None if entry_id is not one
+        """
+        try:
+            list_id, day, meal_id = str(entry_id).split("-")
+            return (
+                int(list_id),
+                datetime.strptime(day, "%Y%m%d").date(),
+                int(meal_id),
+            )
+        except ValueError:
+            return None
+
+    def to_dict(self, meals=None):
+        return {"key": self.meal.name, "id": self.id, "value": self.value}
+
+
+class EntryRow(
+    namedtuple("EntryRow", ["id", "day_id", "meal_id", "key", "value"])
+):
+    """
+    The columns of an Entry that the listings serialize, read without
+    building Entry objects, see List.get_entries
+    """
+
+    __slots__ = ()
+
+    def to_dict(self, meals=None):
+        return {"key": self.key, "id": self.id, "value": self.value}
+
+
 class Entry(db.Model):
     """
     One entry in the food planner
@@ -474,7 +1067,7 @@ class Entry(db.Model):
     )
 
     meal_id = db.Column(
-        db.Integer, db.ForeignKey("meals.id", ondelete="CASCADE")
+        db.Integer, db.ForeignKey("meals.id", ondelete="CASCADE"), index=True
     )
     meal = db.relationship(
         "Meal", backref=db.backref("entries", passive_deletes=True)
@@ -485,8 +1078,29 @@ class Entry(db.Model):
             self.id, self.day.day, self.day.list_.name
         )
 
-    def to_dict(self):
-        return {"key": self.meal.name, "id": self.id, "value": self.value}
+    def to_dict(self, meals=None):
+        """
+        Takes meals, a dict of meal id -> MealInfo of the list, to name
+        the meal without loading it
+        """
+        meal = meals[self.meal_id] if meals else self.meal
+        return {"key": meal.name, "id": self.id, "value": self.value}
+
+    @staticmethod
+    def update_values(values):
+        """
+        Takes a dict of entry id -> value and writes all of them with one
+        executemany UPDATE, without committing
+        """
+        if not values:
+            return
+        table = Entry.__table__
+        db.session.execute(
+            table.update()
+            .where(table.c.id == db.bindparam("entry_id"))
+            .values(value=db.bindparam("new_value")),
+            [{"entry_id": k, "new_value": v} for k, v in values.items()],
+        )
 
 
 class ListPermission(db.Model):
@@ -500,6 +1114,15 @@ class ListPermission(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     permission_level = db.Column(db.String(256), nullable=False)
 
+    __table_args__ = (
+        db.Index(
+            "ix_listpermission_list_id_user_id",
+            "list_id",
+            "user_id",
+            unique=True,
+        ),
+    )
+
     list_id = db.Column(
         db.Integer,
         db.ForeignKey("list.id", ondelete="CASCADE"),
@@ -507,17 +1130,28 @@ class ListPermission(db.Model):
     )
     list_ = db.relationship(
         "List",
-        backref=db.backref("users", cascade="all", passive_deletes=True),
+        backref=db.backref(
+            "users",
+            cascade="all",
+            passive_deletes=True,
+            order_by="ListPermission.id",
+        ),
     )
 
     user_id = db.Column(
         db.Integer,
         db.ForeignKey("user.id", ondelete="CASCADE"),
         nullable=False,
+        index=True,
     )
     user = db.relationship(
         "User",
-        backref=db.backref("lists", cascade="all", passive_deletes=True),
+        backref=db.backref(
+            "lists",
+            cascade="all",
+            passive_deletes=True,
+            order_by="ListPermission.id",
+        ),
     )
 
     def __repr__(self):
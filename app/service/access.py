@@ -0,0 +1,50 @@
+from app import db
+from app.models import Day, Entry, ListPermission
+from app.service.request_cache import memoize
+
+
+def get_permission_level(list_id, user_id):
+    """
+    Returns the permission level (owner or member) of a user on a list,
+    or None if the user has no access
+
+    One lookup on the (list_id, user_id) index, memoized per request
+    """
+
+    def query():
+        row = (
+            db.session.query(ListPermission.permission_level)
+            .filter_by(list_id=list_id, user_id=user_id)
+            .first()
+        )
+        return row.permission_level if row else None
+
+    return memoize("permission", (int(list_id), user_id), query)
+
+
+def get_entry_access(entry_id, user_id):
+    """
+    Returns (list_id, permission level) for an entry in one join
+    from entry through day to listpermission
+
+    Returns None if there is no such entry, the permission level
+    is None if the user has no access to its list
+    """
+    row = (
+        db.session.query(Day.list_id, ListPermission.permission_level)
+        .select_from(Entry)
+        .join(Day, Entry.day_id == Day.id)
+        .outerjoin(
+            ListPermission,
+            db.and_(
+                ListPermission.list_id == Day.list_id,
+                ListPermission.user_id == user_id,
+            ),
+        )
+        .filter(Entry.id == entry_id)
+        .first()
+    )
+    if not row:
+        return None
+    memoize("permission", (row.list_id, user_id), lambda: row.permission_level)
+    return row.list_id, row.permission_level
@@ -0,0 +1,27 @@
+from sqlalchemy.dialects import postgresql
+from app import db
+
+
+def insert_or_ignore(model, rows):
+    """
+    Insert all rows into the table of model in a single statement,
+    silently skipping rows that collide with a unique constraint
+
+    Takes a model class and a list of dicts with identical keys and
+    returns the number of rows inserted
+    """
+    if not rows:
+        return 0
+    table = model.__table__
+    dialect = db.session.get_bind().dialect.name
+    if dialect == "postgresql":
+        stmt = postgresql.insert(table).values(rows).on_conflict_do_nothing()
+    elif dialect == "sqlite":
+        stmt = table.insert().values(rows).prefix_with("OR IGNORE")
+    elif dialect == "mysql":
+        stmt = table.insert().values(rows).prefix_with("IGNORE")
+    else:
+        raise NotImplementedError(
+            f"insert_or_ignore is not supported on {dialect}"
+        )
+    return db.session.execute(stmt).rowcount
@@ -0,0 +1,41 @@
+from datetime import date
+from hashlib import sha1
+from flask import request
+from app import db
+from app.models import List, ListPermission
+from app.service.request_cache import memoize
+
+
+def list_versions(user_id):
+    """
+    Returns (list_id, last_updated) of every list user_id can access,
+    in the order the lists were shared with the user
+    """
+    return memoize(
+        "list_versions",
+        user_id,
+        lambda: db.session.query(List.id, List.last_updated)
+        .join(ListPermission, ListPermission.list_id == List.id)
+        .filter(ListPermission.user_id == user_id)
+        .order_by(ListPermission.id)
+        .all(),
+    )
+
+
+def compute_etag(user_id, versions):
+    """
+    Hashes everything a list response depends on: the endpoint and its
+    arguments, the user (settings and ownership differ per user), the
+    date (the day window moves daily) and the list versions
+    """
+    parts = [
+        request.endpoint,
+        repr(sorted(request.view_args.items())),
+        repr(sorted(request.args.items(multi=True))),
+        str(user_id),
+        date.today().isoformat(),
+    ] + [
+        f"{list_id}@{last_updated.isoformat() if last_updated else ''}"
+        for list_id, last_updated in versions
+    ]
+    return sha1("|".join(parts).encode()).hexdigest()
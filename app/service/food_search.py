@@ -0,0 +1,307 @@
+import heapq
+import time
+from bisect import bisect_left, insort
+from datetime import datetime, timedelta
+from itertools import islice
+from collections import OrderedDict
+from threading import Lock, Thread
+from flask import current_app
+from app import db
+from app.models import FOOD_CHANGES_MAX_AGE, Day, Entry, Food, FoodChange
+
+MAX_INDEXED_LISTS = 256
+UNBUILT = object()
+# changes are read again this far back, in case they were committed late
+# or on a host whose clock is behind
+CHANGES_OVERLAP = timedelta(minutes=1)
+
+
+def grams(text):
+    """The bigrams and trigrams of text"""
+    return {text[i : i + n] for n in (2, 3) for i in range(len(text) - n + 1)}
+
+
+def normalize(text):
+    return " ".join(text.lower().split())
+
+
+class FoodIndex:
+    """
+    Search index over the foods of one list
+
+    Keeps the normalized names sorted, so prefixes are a bisect away,
+    and a posting list of bigrams and trigrams for substrings. Foods are
+    added and removed one by one so a change to the catalogue does not
+    rebuild the index. sync, catch_up, count and search hold the index's
+    lock so threads can share it
+    """
+
+    def __init__(self):
+        self.names = {}
+        self.keys = {}
+        self.sorted_keys = []
+        self.postings = {}
+        self.counts = {}
+        self.uses = {}
+        self.version = UNBUILT
+        self.synced_at = None
+        self.counted_at = None
+        self.refresher = None
+        self.lock = Lock()
+
+    def add(self, food_id, name):
+        key = normalize(name)
+        self.names[food_id] = name
+        self.keys[food_id] = key
+        insort(self.sorted_keys, (key, food_id))
+        for gram in grams(key):
+            self.postings.setdefault(gram, set()).add(food_id)
+
+    def remove(self, food_id):
+        del self.names[food_id]
+        key = self.keys.pop(food_id)
+        self.sorted_keys.pop(bisect_left(self.sorted_keys, (key, food_id)))
+        for gram in grams(key):
+            self.postings[gram].discard(food_id)
+
+    def sync(self, foods, version, synced_at):
+        """Applies the difference to foods, a dict of id -> name"""
+        with self.lock:
+            removed = [(i, None) for i in self.names if i not in foods]
+            self.apply(removed + list(foods.items()))
+            self.version = version
+            self.synced_at = synced_at
+
+    def catch_up(self, changes, version, synced_at):
+        """
+        Applies changes, (food id, name or None once deleted) in the order
+        they were made, applying one twice does no harm
+        """
+        with self.lock:
+            self.apply(changes)
+            self.version = version
+            self.synced_at = synced_at
+
+    def apply(self, changes):
+        changed = set()
+        for food_id, name in changes:
+            if self.names.get(food_id) == name:
+                continue
+            if food_id in self.names:
+                self.remove(food_id)
+            if name is not None:
+                self.add(food_id, name)
+            changed.add(food_id)
+        for food_id in changed:
+            self.uses.pop(food_id, None)
+            key = self.keys.get(food_id)
+            if key in self.counts:
+                self.uses[food_id] = self.counts[key]
+
+    def count(self, counts, counted_at):
+        """Takes counts, a dict of normalized name -> times planned"""
+        with self.lock:
+            self.counts = counts
+            self.rank()
+            self.counted_at = counted_at
+
+    def rank(self):
+        self.uses = {
+            i: self.counts[key]
+            for i, key in self.keys.items()
+            if key in self.counts
+        }
+
+    def candidates(self, q):
+        """Foods containing q"""
+        if len(q) < 2:
+            return [i for i, key in self.keys.items() if q in key]
+        # every name containing q contains all of its grams
+        postings = sorted(
+            (self.postings.get(gram, set()) for gram in grams(q)), key=len
+        )
+        found = set.intersection(*postings)
+        if len(q) <= 3:
+            return found
+        return [i for i in found if q in self.keys[i]]
+
+    def top(self, ids, limit, in_key_order=False):
+        """The limit most used of ids, then the others by name"""
+        used = sorted(
+            (i for i in ids if i in self.uses),
+            key=lambda i: (-self.uses[i], self.keys[i]),
+        )
+        best = used[:limit]
+        if len(best) < limit:
+            unused = (i for i in ids if i not in self.uses)
+            if in_key_order:
+                best += islice(unused, limit - len(best))
+            else:
+                best += heapq.nsmallest(
+                    limit - len(best), unused, key=self.keys.__getitem__
+                )
+        return best
+
+    def search(self, q, limit):
+        """
+        Returns the best limit matches as (id, name, uses): prefixes of
+        the whole name first, then prefixes of a word, then the others,
+        each by how often the food was planned and then by name
+        """
+        q = normalize(q)
+        if not q:
+            return []
+        with self.lock:
+            return self.find(q, limit)
+
+    def find(self, q, limit):
+        lo = bisect_left(self.sorted_keys, (q,))
+        hi = bisect_left(self.sorted_keys, (q + "\uffff",))
+        prefixed = [i for _, i in self.sorted_keys[lo:hi]]
+        best = self.top(prefixed, limit, in_key_order=True)
+        if len(best) < limit:
+            word = f" {q}"
+            rest = [
+                i for i in self.candidates(q) if not self.keys[i].startswith(q)
+            ]
+            best += self.top(
+                [i for i in rest if word in self.keys[i]], limit - len(best)
+            )
+            if len(best) < limit:
+                best += self.top(
+                    [i for i in rest if word not in self.keys[i]],
+                    limit - len(best),
+                )
+        return [(i, self.names[i], self.uses.get(i, 0)) for i in best]
+
+
+def get_index(list_):
+    """
+    Returns the index of list_, brought up to date with the database if
+    its foods changed since it was last used
+
+    Changes are read from FoodChange, the catalogue is only loaded to
+    build the index or when it is older than the changes kept. How often
+    foods were planned is counted once when the index is built and then
+    again in a thread every FOOD_SEARCH_USES_MAX_AGE seconds
+
+    Every process keeps the indexes of the lists searched most recently
+    """
+    indexes, lock = current_app.extensions.setdefault(
+        "food_search", (OrderedDict(), Lock())
+    )
+    with lock:
+        index = indexes.pop(list_.id, None) or FoodIndex()
+        indexes[list_.id] = index
+        while len(indexes) > MAX_INDEXED_LISTS:
+            indexes.popitem(last=False)
+    version = list_.foods_updated
+    now = datetime.utcnow()
+    if (
+        index.version is UNBUILT
+        or now - index.synced_at > FOOD_CHANGES_MAX_AGE - CHANGES_OVERLAP
+    ):
+        food = Food.__table__
+        foods = db.session.execute(
+            db.select([food.c.id, food.c.name]).where(
+                food.c.list_id == list_.id
+            )
+        )
+        index.sync(dict(foods.fetchall()), version, now)
+    elif index.version != version:
+        change = FoodChange.__table__
+        changes = db.session.execute(
+            db.select([change.c.food_id, change.c.name])
+            .where(
+                db.and_(
+                    change.c.list_id == list_.id,
+                    change.c.changed_at >= index.synced_at - CHANGES_OVERLAP,
+                )
+            )
+            .order_by(change.c.id)
+        )
+        index.catch_up(changes.fetchall(), version, now)
+    max_age = current_app.config.get("FOOD_SEARCH_USES_MAX_AGE", 300)
+    if index.counted_at is None:
+        index.count(count_uses(list_.id), time.monotonic())
+    elif time.monotonic() - index.counted_at > max_age:
+        refresh_uses(index, list_.id)
+    return index
+
+
+def refresh_uses(index, list_id):
+    """Counts the uses of list_id again in a thread, unless one is already"""
+    app = current_app._get_current_object()
+    with index.lock:
+        if index.refresher is not None and index.refresher.is_alive():
+            return
+        index.refresher = Thread(
+            target=_refresh_uses, args=(app, index, list_id), daemon=True
+        )
+        index.refresher.start()
+
+
+def _refresh_uses(app, index, list_id):
+    with app.app_context():
+        try:
+            index.count(count_uses(list_id), time.monotonic())
+        except Exception:
+            app.logger.exception(f"Counting the food uses of {list_id} failed")
+        finally:
+            db.session.remove()
+
+
+def count_uses(list_id):
+    """Returns a dict of normalized entry value -> times it was planned"""
+    uses = {}
+    rows = (
+        db.session.query(Entry.value, db.func.count(Entry.id))
+        .join(Day, Entry.day_id == Day.id)
+        .filter(Day.list_id == list_id, Entry.value != "")
+        .group_by(Entry.value)
+    )
+    for value, count in rows:
+        key = normalize(value)
+        uses[key] = uses.get(key, 0) + count
+    return uses
+
+
+def search_trigram(list_id, q, limit):
+    """
+    The same ranking done by PostgreSQL, needs the pg_trgm extension and
+    the ix_foods_name_trgm index
+    """
+    pattern = "%{}%".format(
+        q.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    )
+    uses = (
+        db.session.query(
+            db.func.lower(Entry.value).label("value"),
+            db.func.count(Entry.id).label("uses"),
+        )
+        .join(Day, Entry.day_id == Day.id)
+        .filter(Day.list_id == list_id, Entry.value != "")
+        .group_by(db.func.lower(Entry.value))
+        .subquery()
+    )
+    used = db.func.coalesce(uses.c.uses, 0)
+    return (
+        db.session.query(Food.id, Food.name, used)
+        .outerjoin(uses, uses.c.value == db.func.lower(Food.name))
+        .filter(Food.list_id == list_id, Food.name.ilike(pattern, escape="\\"))
+        .order_by(
+            db.case([(Food.name.ilike(pattern[1:], escape="\\"), 0)], else_=1),
+            used.desc(),
+            db.func.similarity(Food.name, q).desc(),
+            Food.name,
+        )
+        .limit(limit)
+        .all()
+    )
+
+
+def search(list_, q, limit=10):
+    """Returns up to limit foods of list_ matching q as (id, name, uses)"""
+    if current_app.config.get("FOOD_SEARCH") == "pg_trgm":
+        return search_trigram(list_.id, q, limit)
+    return get_index(list_).search(q, limit)
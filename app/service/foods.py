@@ -0,0 +1,230 @@
+from uuid import uuid4
+from app import db
+from app.models import (
+    Food,
+    FoodCategory,
+    FoodCategoryAssociation,
+    FoodChange,
+    Ingredient,
+)
+from app.service.bulk import insert_or_ignore
+
+
+def rename_foods(list_id, names):
+    """
+    Takes a dict of food id -> new name and writes all of them with one
+    executemany UPDATE, names may be swapped between the foods
+    """
+    if not names:
+        return
+    table = Food.__table__
+    stmt = (
+        table.update()
+        .where(table.c.id == db.bindparam("food_id"))
+        .values(name=db.bindparam("new_name"))
+    )
+    if len(names) > 1:
+        # move every food out of the way first so no two share a name
+        # halfway through, which the unique index would reject
+        prefix = uuid4().hex
+        db.session.execute(
+            stmt,
+            [{"food_id": k, "new_name": f"{prefix}{k}"} for k in names],
+        )
+    db.session.execute(
+        stmt, [{"food_id": k, "new_name": v} for k, v in names.items()]
+    )
+    FoodChange.log(list_id, names)
+
+
+def delete_foods(list_id, food_ids):
+    """
+    Deletes the foods with their category links and ingredients in
+    three statements, without relying on the database to cascade
+    """
+    if not food_ids:
+        return
+    for model, column in (
+        (FoodCategoryAssociation, FoodCategoryAssociation.food_id),
+        (Ingredient, Ingredient.food_id),
+        (Food, Food.id),
+    ):
+        model.query.filter(column.in_(food_ids)).delete(
+            synchronize_session=False
+        )
+    FoodChange.log(list_id, dict.fromkeys(food_ids))
+
+
+def get_or_create_foods(list_id, names):
+    """Returns a dict of name -> food id, inserting the missing foods"""
+    ids, created = _get_or_create_by_name(Food, list_id, names)
+    FoodChange.log(list_id, {ids[name]: name for name in created})
+    return ids
+
+
+def get_or_create_categories(list_id, names):
+    """Returns a dict of name -> category id, inserting the missing ones"""
+    ids, _ = _get_or_create_by_name(FoodCategory, list_id, names)
+    return ids
+
+
+def _get_or_create_by_name(model, list_id, names):
+    """Returns a dict of name -> id and the names that were missing"""
+    # keep the input order so ids follow it
+    names = list(dict.fromkeys(names))
+    if not names:
+        return {}, []
+
+    def query():
+        return dict(
+            db.session.query(model.name, model.id).filter(
+                model.list_id == list_id, model.name.in_(names)
+            )
+        )
+
+    ids = query()
+    missing = [name for name in names if name not in ids]
+    if missing:
+        insert_or_ignore(
+            model, [{"list_id": list_id, "name": name} for name in missing]
+        )
+        ids = query()
+    return ids, missing
+
+
+def associate_categories(pairs):
+    """Links every (food_id, category_id) pair that is not linked yet"""
+    insert_or_ignore(
+        FoodCategoryAssociation,
+        [
+            {"food_id": food_id, "category_id": category_id}
+            for food_id, category_id in dict.fromkeys(pairs)
+        ],
+    )
+
+
+def dissociate_categories(pairs):
+    """Unlinks every (food_id, category_id) pair that is linked"""
+    pairs = set(pairs)
+    if not pairs:
+        return
+    food_ids = {food_id for food_id, _ in pairs}
+    links = db.session.query(
+        FoodCategoryAssociation.id,
+        FoodCategoryAssociation.food_id,
+        FoodCategoryAssociation.category_id,
+    ).filter(FoodCategoryAssociation.food_id.in_(food_ids))
+    delete_links([i for i, food_id, c in links if (food_id, c) in pairs])
+
+
+def delete_links(link_ids):
+    """Deletes the category links with the given ids in one statement"""
+    if link_ids:
+        FoodCategoryAssociation.query.filter(
+            FoodCategoryAssociation.id.in_(link_ids)
+        ).delete(synchronize_session=False)
+
+
+def set_categories(list_id, categories):
+    """
+    Takes a dict of food id -> category names and makes those exactly the
+    categories of each food, creating the categories that do not exist
+
+    Runs the same handful of statements however many foods and
+    categories there are and returns the (food_id, category_id) pairs
+    linked, in the given order, and the set of pairs unlinked. Nothing
+    is committed
+    """
+    if not categories:
+        return [], set()
+    category_ids = get_or_create_categories(
+        list_id, [c for names in categories.values() for c in names]
+    )
+    # a list so new links are made in the order they were given
+    wanted = list(
+        dict.fromkeys(
+            (food_id, category_ids[c])
+            for food_id, names in categories.items()
+            for c in names
+        )
+    )
+    links = {
+        (food_id, c): link_id
+        for link_id, food_id, c in db.session.query(
+            FoodCategoryAssociation.id,
+            FoodCategoryAssociation.food_id,
+            FoodCategoryAssociation.category_id,
+        ).filter(FoodCategoryAssociation.food_id.in_(categories))
+    }
+    added = [pair for pair in wanted if pair not in links]
+    removed = links.keys() - set(wanted)
+    associate_categories(added)
+    delete_links([links[pair] for pair in removed])
+    return added, removed
+
+
+def add_ingredients(pairs):
+    """Adds every (food_id, name) ingredient the food does not have yet"""
+    pairs = list(dict.fromkeys(pairs))
+    if not pairs:
+        return
+    existing = set(
+        db.session.query(Ingredient.food_id, Ingredient.name).filter(
+            Ingredient.food_id.in_({food_id for food_id, _ in pairs})
+        )
+    )
+    missing = [
+        {"food_id": food_id, "name": name}
+        for food_id, name in pairs
+        if (food_id, name) not in existing
+    ]
+    if missing:
+        db.session.execute(Ingredient.__table__.insert(), missing)
+
+
+def import_foods(list_id, foods):
+    """
+    Takes (name, categories, ingredients) tuples and adds whatever foods,
+    categories, category links and ingredients are missing, with a fixed
+    number of statements however many foods there are
+
+    Existing foods keep their other categories and ingredients, nothing
+    is committed
+    """
+    food_ids = get_or_create_foods(list_id, [name for name, _, _ in foods])
+    category_ids = get_or_create_categories(
+        list_id, [c for _, categories, _ in foods for c in categories]
+    )
+    associate_categories(
+        (food_ids[name], category_ids[c])
+        for name, categories, _ in foods
+        for c in categories
+    )
+    add_ingredients(
+        (food_ids[name], i)
+        for name, _, ingredients in foods
+        for i in ingredients
+    )
+    return food_ids
+
+
+def apply_food_changes(list_id, creates, renames, deletes, categories):
+    """
+    Applies a batch of catalogue edits with a fixed number of statements
+
+    Takes a list of (name, category names or None) to create, a dict of
+    food id -> new name, a set of food ids to delete and a dict of food
+    id -> category names. Names are expected to be unique already.
+    Returns the ids of the created foods, nothing is committed
+    """
+    delete_foods(list_id, deletes)
+    rename_foods(list_id, renames)
+    created = get_or_create_foods(list_id, [name for name, _ in creates])
+    categories = {
+        **categories,
+        **{created[name]: c for name, c in creates if c is not None},
+    }
+    added, removed = set_categories(list_id, categories)
+    created = [created[name] for name, _ in creates]
+    changed = {food_id for food_id, _ in added} | {i for i, _ in removed}
+    return created, changed - set(created)
@@ -0,0 +1,103 @@
+import json
+import os
+import time
+import traceback
+from flask import g, request, has_request_context
+from sqlalchemy import event
+from app import db
+
+APP_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def init_app(app):
+    """
+    Records the number of SQL statements, the time spent in the database
+    and the slowest statements of every request
+
+    Results are sent as a Server-Timing header and logged as one JSON line
+    per request, statements slower than SLOW_QUERY_THRESHOLD_MS are logged
+    in full together with the application frames that issued them
+    """
+    if not app.config.get("SQL_INSTRUMENTATION"):
+        return
+    engine = db.get_engine(app)
+    threshold = app.config.get("SLOW_QUERY_THRESHOLD_MS", 100)
+    keep = app.config.get("SLOWEST_STATEMENTS", 3)
+
+    def before_cursor_execute(conn, cursor, statement, *args):
+        conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+    def after_cursor_execute(
+        conn, cursor, statement, parameters, context, executemany
+    ):
+        elapsed = (time.perf_counter() - conn.info["query_start"].pop()) * 1000
+        if not has_request_context() or "sql_stats" not in g:
+            return
+        stats = g.sql_stats
+        stats["count"] += 1
+        stats["time"] += elapsed
+        stats["slowest"] = sorted(
+            stats["slowest"] + [(elapsed, statement)], reverse=True
+        )[:keep]
+        if elapsed >= threshold:
+            # parameters stay out of the log, they carry password hashes,
+            # emails and entries
+            app.logger.warning(
+                "Slow query (%.1fms) on %s: %s\n%s",
+                elapsed,
+                request.endpoint,
+                statement,
+                call_site(),
+            )
+
+    def start_request():
+        g.sql_stats = {
+            "start": time.perf_counter(),
+            "count": 0,
+            "time": 0.0,
+            "slowest": [],
+        }
+
+    def finish_request(response):
+        stats = g.pop("sql_stats", None)
+        if stats is None:
+            return response
+        total = (time.perf_counter() - stats["start"]) * 1000
+        response.headers.add(
+            "Server-Timing",
+            f'db;dur={stats["time"]:.2f};desc="{stats["count"]} queries", '
+            f"app;dur={total:.2f}",
+        )
+        app.logger.info(
+            json.dumps(
+                {
+                    "endpoint": request.endpoint,
+                    "method": request.method,
+                    "status": response.status_code,
+                    "duration_ms": round(total, 2),
+                    "sql_count": stats["count"],
+                    "sql_ms": round(stats["time"], 2),
+                    "slowest": [
+                        {"ms": round(ms, 2), "statement": " ".join(s.split())}
+                        for ms, s in stats["slowest"]
+                    ],
+                }
+            )
+        )
+        return response
+
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", after_cursor_execute)
+    app.before_request(start_request)
+    app.after_request(finish_request)
+
+
+def call_site():
+    """Formats the stack frames of the application leading to this call"""
+    frames = [
+        frame
+        for frame in traceback.extract_stack()[:-1]
+        if frame.filename.startswith(APP_ROOT)
+        and frame.filename != os.path.abspath(__file__)
+    ]
+    return "".join(traceback.format_list(frames))
@@ -0,0 +1,128 @@
+import re
+from datetime import date
+from functools import lru_cache
+from uuid import uuid4
+from flask.json import JSONEncoder as FlaskJSONEncoder, dumps
+from werkzeug.http import http_date
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+try:
+    import ujson
+except ImportError:
+    ujson = None
+
+
+class Fragment:
+    """
+    JSON that is already serialized, embedded as is by the encoders below
+    so cached arrays are not decoded and encoded again
+
+    Takes a str or utf-8 bytes
+    """
+
+    __slots__ = ("json",)
+
+    def __init__(self, json):
+        self.json = json.decode() if isinstance(json, bytes) else json
+
+    @staticmethod
+    def of(obj):
+        """Serializes obj once with the app's encoder"""
+        return Fragment(dumps(obj))
+
+
+class JSONEncoder(FlaskJSONEncoder):
+    """
+    Flask's encoder that can also embed Fragment, dates keep Flask's HTTP
+    date format. Subclasses swap the library doing the encoding in dump
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.fragments = []
+        self.token = None
+
+    def default(self, o):
+        if isinstance(o, Fragment):
+            # stand in a string that is swapped for the fragment afterwards
+            if self.token is None:
+                self.token = uuid4().hex
+            self.fragments.append(o.json)
+            return f"{self.token}:{len(self.fragments) - 1}"
+        if type(o) is date:
+            # the same few days repeat across a listing
+            return _format_day(o)
+        if isinstance(o, tuple):
+            return list(o)
+        return super().default(o)
+
+    def encode(self, o):
+        text = self.dump(o)
+        if self.fragments:
+            text = re.sub(
+                f'"{self.token}:(\\d+)"',
+                lambda m: self.fragments[int(m.group(1))],
+                text,
+            )
+        return text
+
+    def dump(self, o):
+        return super().encode(o)
+
+
+@lru_cache(maxsize=4096)
+def _format_day(day):
+    return http_date(day.timetuple())
+
+
+class OrjsonEncoder(JSONEncoder):
+    """
+    Encodes with orjson, which writes non-ASCII characters as utf-8
+    instead of escaping them
+    """
+
+    def dump(self, o):
+        option = orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS
+        if self.sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        if self.indent:
+            option |= orjson.OPT_INDENT_2
+        return orjson.dumps(o, default=self.default, option=option).decode()
+
+
+class UjsonEncoder(JSONEncoder):
+    def dump(self, o):
+        return ujson.dumps(
+            o,
+            default=self.default,
+            ensure_ascii=self.ensure_ascii,
+            sort_keys=self.sort_keys,
+            indent=self.indent or 0,
+            escape_forward_slashes=False,
+        )
+
+
+# (JSON_BACKEND, module, encoder) in the order auto tries them
+BACKENDS = [
+    ("orjson", orjson, OrjsonEncoder),
+    ("ujson", ujson, UjsonEncoder),
+    ("json", True, JSONEncoder),
+]
+
+
+def init_app(app):
+    """
+    Makes jsonify use JSON_BACKEND: orjson, ujson, json (the standard
+    library) or auto, the first of them that is installed
+    """
+    backend = app.config.get("JSON_BACKEND") or "auto"
+    for name, module, encoder in BACKENDS:
+        if backend == name and not module:
+            raise ValueError(f"JSON_BACKEND {backend} is not installed")
+        if backend == name or (backend == "auto" and module):
+            app.json_encoder = encoder
+            return
+    raise ValueError(f"Unknown JSON_BACKEND {backend}")
@@ -1,4 +1,85 @@
+from flask import current_app
+from sqlalchemy.orm import selectinload
+from app import db
+from app.models import List, ListSettings
+from app.service.bulk import insert_or_ignore
+from app.service.etags import list_versions
+from app.service.metrics import count_created
+
+
 def get_lists(current_user, offset=0, limit=None, start_today=False):
-    lists = current_user.get_lists()
-    obj = [l.to_dict(offset, limit, start_today) for l in lists]
-    return obj
+    """
+    Serializes every list of current_user like List.to_dict does,
+    using a fixed number of queries regardless of how many lists there are
+    """
+    versions = dict(list_versions(current_user.id))
+    list_ids = list(versions)
+    if not list_ids:
+        return []
+
+    # create whatever is missing first, as committing expires loaded rows
+    List.get_meal_schemas(versions)
+    settings = get_or_create_settings(list_ids, current_user)
+    windows = {
+        list_id: List.get_window(settings[list_id], offset, limit, start_today)
+        for list_id in list_ids
+    }
+    if not current_app.config.get("VIRTUAL_DAYS"):
+        days = List.get_or_create_days_for_windows(windows)
+
+    lists = (
+        List.query.filter(List.id.in_(list_ids))
+        .options(
+            selectinload(List.users),
+            selectinload(List.foods),
+            selectinload(List.categories),
+        )
+        .all()
+    )
+    position = {list_id: idx for idx, list_id in enumerate(list_ids)}
+    lists = sorted(lists, key=lambda l: position[l.id])
+    if current_app.config.get("VIRTUAL_DAYS"):
+        days = List.get_virtual_days_for_windows(windows)
+    # inserting days above expires the settings, reload them in one go
+    settings = get_or_create_settings(list_ids, current_user)
+    return [
+        l.to_dict(
+            offset,
+            limit,
+            start_today,
+            list_settings=settings[l.id],
+            days=days[l.id],
+        )
+        for l in lists
+    ]
+
+
+def get_or_create_settings(list_ids, user):
+    """Returns a dict of list_id -> the ListSettings of user"""
+
+    def query():
+        return {
+            s.list_id: s
+            for s in ListSettings.query.filter(
+                ListSettings.list_id.in_(list_ids),
+                ListSettings.user_id == user.id,
+            )
+        }
+
+    settings = query()
+    missing = [
+        {
+            "list_id": list_id,
+            "user_id": user.id,
+            "start_day_of_week": -1,
+            "days_to_display": 7,
+        }
+        for list_id in list_ids
+        if list_id not in settings
+    ]
+    if missing:
+        created = insert_or_ignore(ListSettings, missing)
+        db.session.commit()
+        count_created(ListSettings.__tablename__, created)
+        settings = query()
+    return settings
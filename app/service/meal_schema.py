@@ -0,0 +1,50 @@
+from collections import OrderedDict
+from threading import Lock
+from flask import current_app, has_app_context
+
+MAX_CACHED_LISTS = 1024
+
+
+def _cache():
+    return current_app.extensions.setdefault(
+        "meal_schema", (OrderedDict(), Lock())
+    )
+
+
+def lookup(versions):
+    """
+    Takes a dict of list id -> last_updated and returns a dict of list
+    id -> meal schema for the lists cached at that version
+    """
+    schemas, lock = _cache()
+    found = {}
+    with lock:
+        for list_id, version in versions.items():
+            cached = schemas.get(list_id)
+            if cached and cached[0] == version:
+                schemas.move_to_end(list_id)
+                found[list_id] = cached[1]
+    return found
+
+
+def store(versions, loaded):
+    """Caches every schema in loaded at the version in versions"""
+    schemas, lock = _cache()
+    with lock:
+        for list_id, schema in loaded.items():
+            schemas[list_id] = (versions[list_id], schema)
+            schemas.move_to_end(list_id)
+        while len(schemas) > MAX_CACHED_LISTS:
+            schemas.popitem(last=False)
+
+
+def forget(list_id):
+    """
+    Drops the schema of a list, Meal rows written through the session do
+    this on flush, bulk statements on meals have to call it
+    """
+    if not has_app_context():
+        return
+    schemas, lock = _cache()
+    with lock:
+        schemas.pop(list_id, None)
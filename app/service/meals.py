@@ -0,0 +1,72 @@
+from uuid import uuid4
+from app import db
+from app.models import Entry, Meal
+from app.service import meal_schema
+
+
+def set_meals(list_id, wanted):
+    """
+    Makes wanted, a list of (meal id or None, name) in display order, the
+    meals of the list with one query and at most one bulk delete, one
+    executemany update and one bulk insert, without committing
+
+    Meals that are not in wanted are deleted along with their entries.
+    Entries of new meals are not created here, reads fill them in. Ids
+    are expected to belong to the list and names to be unique
+    """
+    current = {
+        m.id: (m.name, m.order)
+        for m in db.session.query(Meal.id, Meal.name, Meal.order).filter(
+            Meal.list_id == list_id
+        )
+    }
+    kept = {meal_id for meal_id, _ in wanted if meal_id is not None}
+    removed = current.keys() - kept
+    if removed:
+        Entry.query.filter(Entry.meal_id.in_(removed)).delete(
+            synchronize_session=False
+        )
+        Meal.query.filter(Meal.id.in_(removed)).delete(
+            synchronize_session=False
+        )
+
+    changed = [
+        {"meal_id": meal_id, "new_name": name, "new_order": order}
+        for order, (meal_id, name) in enumerate(wanted)
+        if meal_id is not None and current[meal_id] != (name, order)
+    ]
+    if changed:
+        table = Meal.__table__
+        stmt = (
+            table.update()
+            .where(table.c.id == db.bindparam("meal_id"))
+            .values(
+                name=db.bindparam("new_name"), order=db.bindparam("new_order")
+            )
+        )
+        renamed = [
+            row
+            for row in changed
+            if row["new_name"] != current[row["meal_id"]][0]
+        ]
+        if len(renamed) > 1:
+            # names are unique per list, move the renamed meals out of the
+            # way first so two of them can swap names
+            prefix = uuid4().hex
+            db.session.execute(
+                stmt,
+                [
+                    {**row, "new_name": f"{prefix}{row['meal_id']}"}
+                    for row in renamed
+                ],
+            )
+        db.session.execute(stmt, changed)
+
+    new = [
+        {"list_id": list_id, "name": name, "order": order}
+        for order, (meal_id, name) in enumerate(wanted)
+        if meal_id is None
+    ]
+    if new:
+        db.session.execute(Meal.__table__.insert(), new)
+    meal_schema.forget(list_id)
@@ -0,0 +1,153 @@
+import os
+import time
+from flask import Response, current_app, g, request, has_request_context
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+    multiprocess,
+)
+from prometheus_client.core import GaugeMetricFamily
+from sqlalchemy import event
+from app import db
+
+REQUEST_LATENCY = Histogram(
+    "foodlist_request_duration_seconds",
+    "Request latency",
+    ["blueprint", "endpoint", "method"],
+)
+REQUEST_COUNT = Counter(
+    "foodlist_requests_total",
+    "Responses sent",
+    ["blueprint", "endpoint", "method", "status"],
+)
+SQL_STATEMENTS = Histogram(
+    "foodlist_sql_statements_per_request",
+    "SQL statements executed per request",
+    ["blueprint", "endpoint"],
+    buckets=(1, 2, 5, 10, 20, 50, 100, 200, 500, float("inf")),
+)
+POOL_CHECKED_OUT = Gauge(
+    "foodlist_db_pool_checked_out",
+    "Database connections in use",
+    multiprocess_mode="livesum",
+)
+POOL_OVERFLOW = Gauge(
+    "foodlist_db_pool_overflow",
+    "Database connections opened beyond the pool size",
+    multiprocess_mode="livesum",
+)
+ROWS_CREATED = Counter(
+    "foodlist_rows_created_total",
+    "Rows created on read by the get_or_create helpers",
+    ["table"],
+)
+RESPONSE_CACHE_HITS = Counter(
+    "foodlist_response_cache_hits_total", "Responses served from cache"
+)
+RESPONSE_CACHE_MISSES = Counter(
+    "foodlist_response_cache_misses_total", "Cache lookups without a result"
+)
+RESPONSE_CACHE_EVICTIONS = Counter(
+    "foodlist_response_cache_evictions_total",
+    "Responses dropped from the cache to make room",
+)
+RESPONSE_CACHE_BYTES = Gauge(
+    "foodlist_response_cache_bytes",
+    "Size of the response bodies cached in process memory",
+    multiprocess_mode="livesum",
+)
+
+
+class ScrapedGauge:
+    """
+    Gauge whose value is measured by calling function when /metrics is
+    scraped, for state that no single worker keeps track of
+
+    Takes name, documentation and function
+    """
+
+    def __init__(self, name, documentation, function):
+        self.name = name
+        self.documentation = documentation
+        self.function = function
+
+    def collect(self):
+        yield GaugeMetricFamily(
+            self.name, self.documentation, value=self.function()
+        )
+
+
+def init_app(app):
+    """
+    Collects request, SQL and connection pool metrics and serves them
+    on /metrics
+
+    When PROMETHEUS_MULTIPROC_DIR is set every worker writes its samples
+    there and /metrics aggregates all of them, see gunicorn.conf.py
+    """
+    engine = db.get_engine(app)
+
+    def before_cursor_execute(*args):
+        if has_request_context() and "metrics_start" in g:
+            g.metrics_statements += 1
+
+    def pool_changed(*args):
+        pool = engine.pool
+        if hasattr(pool, "checkedout"):
+            POOL_CHECKED_OUT.set(pool.checkedout())
+        if hasattr(pool, "overflow"):
+            POOL_OVERFLOW.set(max(pool.overflow(), 0))
+
+    def start_request():
+        g.metrics_start = time.perf_counter()
+        g.metrics_statements = 0
+
+    def finish_request(response):
+        start = g.pop("metrics_start", None)
+        if start is None:
+            return response
+        blueprint = request.blueprint or ""
+        endpoint = request.endpoint or "unmatched"
+        REQUEST_LATENCY.labels(blueprint, endpoint, request.method).observe(
+            time.perf_counter() - start
+        )
+        REQUEST_COUNT.labels(
+            blueprint, endpoint, request.method, response.status_code
+        ).inc()
+        SQL_STATEMENTS.labels(blueprint, endpoint).observe(
+            g.pop("metrics_statements")
+        )
+        return response
+
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    event.listen(engine, "checkout", pool_changed)
+    event.listen(engine, "checkin", pool_changed)
+    app.before_request(start_request)
+    app.after_request(finish_request)
+    app.add_url_rule("/metrics", "metrics", metrics)
+
+
+def metrics():
+    registry = CollectorRegistry()
+    if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry.register(REGISTRY)
+    for collector in current_app.extensions.get("metrics_collectors", []):
+        registry.register(collector)
+    return Response(generate_latest(registry), mimetype=CONTENT_TYPE_LATEST)
+
+
+def register_collector(app, collector):
+    """Adds collector, such as a ScrapedGauge, to the app's /metrics"""
+    app.extensions.setdefault("metrics_collectors", []).append(collector)
+
+
+def count_created(table, rows):
+    if rows > 0:
+        ROWS_CREATED.labels(table).inc(rows)
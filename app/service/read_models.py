@@ -0,0 +1,112 @@
+from functools import lru_cache
+from app import db
+from app.models import (
+    Food,
+    FoodCategory,
+    FoodCategoryAssociation,
+    ListPermission,
+    User,
+)
+from app.service.json_encoding import Fragment
+
+
+def _rows(stmt):
+    return db.session.execute(stmt).fetchall()
+
+
+def foods(list_id, food_ids=None):
+    """
+    The foods of a list, or only those in food_ids, like Food.to_dict
+    with their category ids in one outer joined select
+    """
+    if food_ids is not None and not food_ids:
+        return []
+    food = Food.__table__
+    link = FoodCategoryAssociation.__table__
+    stmt = (
+        db.select([food.c.id, food.c.name, link.c.category_id])
+        .select_from(food.outerjoin(link, link.c.food_id == food.c.id))
+        .where(food.c.list_id == list_id)
+        .order_by(food.c.id, link.c.id)
+    )
+    if food_ids is not None:
+        stmt = stmt.where(food.c.id.in_(food_ids))
+    by_id = {}
+    for food_id, name, category_id in _rows(stmt):
+        obj = by_id.get(food_id)
+        if obj is None:
+            obj = by_id[food_id] = {
+                "id": food_id,
+                "name": name,
+                "categories": [],
+            }
+        if category_id is not None:
+            obj["categories"].append(category_id)
+    return list(by_id.values())
+
+
+def meals(list_):
+    """The meals of a list like Meal.to_dict, from its meal schema"""
+    return [meal.to_dict() for meal in list_.get_or_create_meals()]
+
+
+def meals_json(list_):
+    """meals as a Fragment, serialized once per meal schema"""
+    return _serialize_schema(list_.get_or_create_meals())
+
+
+@lru_cache(maxsize=1024)
+def _serialize_schema(schema):
+    return Fragment.of([meal.to_dict() for meal in schema])
+
+
+def categories(list_id):
+    category = FoodCategory.__table__
+    stmt = (
+        db.select([category.c.id, category.c.name])
+        .where(category.c.list_id == list_id)
+        .order_by(category.c.id)
+    )
+    return [{"id": i, "name": name} for i, name in _rows(stmt)]
+
+
+def shares(list_id):
+    """The permissions on a list like ListPermission.to_dict"""
+    permission = ListPermission.__table__
+    user = User.__table__
+    stmt = (
+        db.select(
+            [permission.c.id, user.c.username, permission.c.permission_level]
+        )
+        .select_from(permission.join(user, user.c.id == permission.c.user_id))
+        .where(permission.c.list_id == list_id)
+        .order_by(permission.c.id)
+    )
+    return [
+        {"id": i, "username": username, "permission_level": level}
+        for i, username, level in _rows(stmt)
+    ]
+
+
+def users(current_user_id):
+    """
+    Every user like User.to_dict, only current_user_id gets the private
+    columns
+    """
+    user = User.__table__
+    stmt = db.select(
+        [
+            user.c.id,
+            user.c.username,
+            user.c.email,
+            user.c.firstname,
+            user.c.lastname,
+        ]
+    ).order_by(user.c.id)
+    result = []
+    for i, username, email, firstname, lastname in _rows(stmt):
+        obj = {"id": i, "username": username}
+        if i == current_user_id:
+            obj.update(email=email, firstname=firstname, lastname=lastname)
+        result.append(obj)
+    return result
@@ -0,0 +1,21 @@
+from flask import g, has_request_context
+
+
+def memoize(namespace, key, loader):
+    """
+    Returns loader(), computed at most once per request for namespace and key
+
+    Outside of a request nothing is cached
+    """
+    if not has_request_context():
+        return loader()
+    cache = g.setdefault("request_cache", {}).setdefault(namespace, {})
+    if key not in cache:
+        cache[key] = loader()
+    return cache[key]
+
+
+def clear(response=None):
+    """Empties the request cache, usable as after_request/teardown hook"""
+    g.pop("request_cache", None)
+    return response
@@ -0,0 +1,165 @@
+import os
+import tempfile
+from collections import OrderedDict
+from threading import Lock
+from flask import current_app
+from app.service.metrics import (
+    RESPONSE_CACHE_HITS,
+    RESPONSE_CACHE_MISSES,
+    RESPONSE_CACHE_EVICTIONS,
+    RESPONSE_CACHE_BYTES,
+    ScrapedGauge,
+    register_collector,
+)
+
+
+class NullCache:
+    """Caches nothing"""
+
+    def get(self, key):
+        return None
+
+    def set(self, key, body):
+        pass
+
+
+class MemoryCache:
+    """
+    Least recently used cache of response bodies, private to the process
+
+    Takes max_entries
+    """
+
+    def __init__(self, max_entries=1000):
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+        self.lock = Lock()
+
+    def get(self, key):
+        with self.lock:
+            body = self.entries.get(key)
+            if body is not None:
+                self.entries.move_to_end(key)
+        return body
+
+    def set(self, key, body):
+        with self.lock:
+            old = self.entries.pop(key, None)
+            if old is not None:
+                RESPONSE_CACHE_BYTES.dec(len(old))
+            self.entries[key] = body
+            RESPONSE_CACHE_BYTES.inc(len(body))
+            while len(self.entries) > self.max_entries:
+                _, evicted = self.entries.popitem(last=False)
+                RESPONSE_CACHE_BYTES.dec(len(evicted))
+                RESPONSE_CACHE_EVICTIONS.inc()
+
+
+class SharedCache:
+    """
+    Cache of response bodies stored as files in directory, so every
+    worker on the host shares it. Point it at a tmpfs such as /dev/shm
+    to keep it in memory
+
+    Takes directory and max_entries, the least recently read entries are
+    removed once there are a tenth more than max_entries. The size of the
+    directory is measured when /metrics is scraped, see init_app
+    """
+
+    def __init__(self, directory, max_entries=1000):
+        self.directory = directory
+        self.max_entries = max_entries
+        os.makedirs(directory, exist_ok=True)
+
+    def get(self, key):
+        path = os.path.join(self.directory, key)
+        try:
+            with open(path, "rb") as f:
+                body = f.read()
+            os.utime(path)
+        except FileNotFoundError:
+            return None
+        return body
+
+    def set(self, key, body):
+        path = os.path.join(self.directory, key)
+        if os.path.exists(path):
+            return
+        fd, tmp = tempfile.mkstemp(dir=self.directory, prefix=".")
+        with os.fdopen(fd, "wb") as f:
+            f.write(body)
+        os.replace(tmp, path)
+        self.evict()
+
+    def evict(self):
+        with os.scandir(self.directory) as it:
+            entries = [e for e in it if not e.name.startswith(".")]
+        if len(entries) <= self.max_entries * 1.1:
+            return
+        by_age = []
+        for e in entries:
+            try:
+                stat = e.stat()
+            except FileNotFoundError:
+                continue
+            by_age.append((stat.st_mtime, e.path))
+        by_age.sort()
+        for _, path in by_age[: len(by_age) - self.max_entries]:
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                # another worker got there first
+                continue
+            RESPONSE_CACHE_EVICTIONS.inc()
+
+    def size(self):
+        """The total size of the cached bodies in directory"""
+        total = 0
+        with os.scandir(self.directory) as it:
+            for e in it:
+                if e.name.startswith("."):
+                    continue
+                try:
+                    total += e.stat().st_size
+                except FileNotFoundError:
+                    continue
+        return total
+
+
+def init_app(app):
+    backend = app.config.get("RESPONSE_CACHE") or "null"
+    size = app.config.get("RESPONSE_CACHE_SIZE", 1000)
+    if backend == "null":
+        cache = NullCache()
+    elif backend == "memory":
+        cache = MemoryCache(size)
+    elif backend == "shared":
+        cache = SharedCache(app.config["RESPONSE_CACHE_DIR"], size)
+        # every worker writes and evicts, so no worker can count the size
+        register_collector(
+            app,
+            ScrapedGauge(
+                "foodlist_response_cache_shared_bytes",
+                "Size of the response bodies in the shared cache directory",
+                cache.size,
+            ),
+        )
+    else:
+        raise ValueError(f"Unknown RESPONSE_CACHE backend {backend}")
+    app.extensions["response_cache"] = cache
+
+
+def lookup(key):
+    cache = current_app.extensions["response_cache"]
+    if isinstance(cache, NullCache):
+        return None
+    body = cache.get(key)
+    if body is None:
+        RESPONSE_CACHE_MISSES.inc()
+    else:
+        RESPONSE_CACHE_HITS.inc()
+    return body
+
+
+def store(key, body):
+    current_app.extensions["response_cache"].set(key, body)
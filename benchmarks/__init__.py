@@ -0,0 +1,11 @@
+import os
+from config import Config
+
+basedir = os.path.abspath(os.path.dirname(__file__))
+
+
+class BenchmarkConfig(Config):
+    TESTING = True
+    SQLALCHEMY_DATABASE_URI = os.environ.get(
+        "BENCHMARK_DATABASE_URL"
+    ) or "sqlite:///" + os.path.join(basedir, "benchmark.db")
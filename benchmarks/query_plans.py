@@ -0,0 +1,121 @@
+"""
+Shows the query plans of the hot lookups on a seeded database, without
+and with the indexes added in migration 2e42d2b00a10
+
+    python -m benchmarks.query_plans
+"""
+
+from app import db, create_app
+from benchmarks import BenchmarkConfig
+from benchmarks.seed import seed
+
+INDEXES = [
+    "ix_user_username",
+    "ix_user_email",
+    "ix_listpermission_user_id",
+    "ix_listpermission_list_id_user_id",
+    "ix_listsettings_list_id_user_id",
+    "ix_foods_list_id_name",
+    "ix_foodcategories_list_id_name",
+    "ix_foodcategoryassociation_food_id_category_id",
+    "ix_foodcategoryassociation_category_id",
+    "ix_ingredients_food_id",
+    "ix_entry_meal_id",
+]
+
+QUERIES = [
+    ("user by username", 'SELECT * FROM "user" WHERE username = :v', "user1"),
+    (
+        "user by email",
+        'SELECT * FROM "user" WHERE email = :v',
+        "user1@example.com",
+    ),
+    ("lists of a user", "SELECT * FROM listpermission WHERE user_id = :v", 1),
+    (
+        "list access check",
+        "SELECT permission_level FROM listpermission "
+        "WHERE list_id = :v AND user_id = 1",
+        1,
+    ),
+    (
+        "settings of a user",
+        "SELECT * FROM listsettings WHERE list_id = :v AND user_id = 1",
+        1,
+    ),
+    (
+        "food by name",
+        "SELECT * FROM foods WHERE list_id = 1 AND name = :v",
+        "Food 1",
+    ),
+    ("catalogue of a list", "SELECT * FROM foods WHERE list_id = :v", 1),
+    (
+        "categories of a list",
+        "SELECT * FROM foodcategories WHERE list_id = :v",
+        1,
+    ),
+    (
+        "categories of a food",
+        "SELECT * FROM foodcategoryassociation WHERE food_id = :v",
+        1,
+    ),
+    (
+        "foods of a category",
+        "SELECT * FROM foodcategoryassociation WHERE category_id = :v",
+        1,
+    ),
+    (
+        "ingredients of a food",
+        "SELECT * FROM ingredients WHERE food_id = :v",
+        1,
+    ),
+    ("entries of a meal", "SELECT * FROM entry WHERE meal_id = :v", 1),
+    ("entries of a day", "SELECT * FROM entry WHERE day_id = :v", 1),
+    ("days of a list", "SELECT * FROM day WHERE list_id = :v", 1),
+]
+
+
+def explain(sql, value):
+    if db.engine.dialect.name == "sqlite":
+        rows = db.session.execute("EXPLAIN QUERY PLAN " + sql, {"v": value})
+        return [row[-1] for row in rows]
+    rows = db.session.execute("EXPLAIN " + sql, {"v": value})
+    return [row[0] for row in rows]
+
+
+def collect():
+    return {name: explain(sql, value) for name, sql, value in QUERIES}
+
+
+def main():
+    app = create_app(BenchmarkConfig)
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+        indexes = [
+            index
+            for table in db.metadata.sorted_tables
+            for index in table.indexes
+            if index.name in INDEXES
+        ]
+        for index in indexes:
+            index.drop(db.engine)
+        print(seed(users=50, lists_per_user=2, days=730))
+        if db.engine.dialect.name == "postgresql":
+            db.session.execute("ANALYZE")
+        before = collect()
+        db.session.commit()
+        for index in indexes:
+            index.create(db.engine)
+        if db.engine.dialect.name == "postgresql":
+            db.session.execute("ANALYZE")
+        after = collect()
+        for name, _, _ in QUERIES:
+            print(f"\n{name}")
+            for line in before[name]:
+                print(f"  before: {line}")
+            for line in after[name]:
+                print(f"  after:  {line}")
+
+
+if __name__ == "__main__":
+    main()
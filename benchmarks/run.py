@@ -0,0 +1,221 @@
+"""
+Times the hot API endpoints against a seeded database and reports
+p50/p95 latency and the number of SQL statements per request
+
+    python -m benchmarks.run --iterations 50 --save benchmarks/baseline.json
+    python -m benchmarks.run --compare benchmarks/baseline.json
+"""
+
+import argparse
+import json
+import math
+import sys
+import time
+from contextlib import contextmanager
+from sqlalchemy import event
+from app import db, create_app
+from benchmarks import BenchmarkConfig
+from benchmarks.seed import seed, PASSWORD
+
+LIST_ID = 1
+FOOD_ID = 1
+
+
+def get_lists(client, i):
+    return client.get("/api/lists")
+
+
+def get_days(client, i):
+    return client.get("/api/days")
+
+
+def get_entries(client, i):
+    return client.get("/api/entries")
+
+
+def get_foods(client, i):
+    return client.get(f"/api/lists/{LIST_ID}/foods")
+
+
+def search_foods(client, i):
+    return client.get(f"/api/lists/{LIST_ID}/foods/search?q=food {i % 10}")
+
+
+def put_meals(client, i):
+    meals = client.get(f"/api/lists/{LIST_ID}/meals").get_json()
+    return client.put(
+        f"/api/lists/{LIST_ID}/meals",
+        json=[{"id": m["id"], "name": m["name"]} for m in reversed(meals)],
+    )
+
+
+def put_food(client, i):
+    return client.put(
+        f"/api/lists/{LIST_ID}/foods/{FOOD_ID}",
+        json={
+            "name": "Food 0",
+            "categories": [f"Category {i % 2}", "Category 2"],
+        },
+    )
+
+
+# (name, function issuing the request as the logged in user)
+SCENARIOS = [
+    ("GET /api/lists", get_lists),
+    ("GET /api/days", get_days),
+    ("GET /api/entries", get_entries),
+    ("GET /api/lists/<id>/foods", get_foods),
+    ("GET /api/lists/<id>/foods/search", search_foods),
+    ("PUT /api/lists/<id>/meals", put_meals),
+    ("PUT /api/lists/<id>/foods/<id>", put_food),
+]
+
+
+@contextmanager
+def count_statements(engine):
+    """
+    Yields a one element list holding the number of statements
+    executed on engine so far
+    """
+    count = [0]
+
+    def before_cursor_execute(*args):
+        count[0] += 1
+
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        yield count
+    finally:
+        event.remove(engine, "before_cursor_execute", before_cursor_execute)
+
+
+def percentile(values, p):
+    ordered = sorted(values)
+    return ordered[max(math.ceil(p * len(ordered)) - 1, 0)]
+
+
+def run(app, iterations=20, warmup=2):
+    """
+    Runs every scenario as user1 and returns a dict of
+    {scenario: {"p50_ms", "p95_ms", "statements", "status"}}
+
+    put_meals fetches the meals before writing them back, which is
+    counted as part of the scenario
+    """
+    client = app.test_client()
+    response = client.post(
+        "/api/auth/login", json={"username": "user1", "password": PASSWORD}
+    )
+    if response.status_code != 200:
+        raise RuntimeError("Could not log in, is the database seeded?")
+    results = {}
+    with app.app_context():
+        engine = db.engine
+    for name, scenario in SCENARIOS:
+        timings = []
+        statements = []
+        for i in range(warmup + iterations):
+            with count_statements(engine) as count:
+                start = time.perf_counter()
+                response = scenario(client, i)
+                elapsed = time.perf_counter() - start
+            if response.status_code >= 400:
+                raise RuntimeError(
+                    f"{name} returned {response.status_code}: "
+                    f"{response.get_data(as_text=True)}"
+                )
+            if i >= warmup:
+                timings.append(elapsed * 1000)
+                statements.append(count[0])
+        results[name] = {
+            "p50_ms": round(percentile(timings, 0.5), 3),
+            "p95_ms": round(percentile(timings, 0.95), 3),
+            "statements": max(statements),
+            "status": response.status_code,
+        }
+    return results
+
+
+def compare(results, baseline, tolerance=0.2):
+    """
+    Returns a list of regressions against baseline, latency counts as
+    regressed when p50 grew by more than tolerance and statement counts
+    regress on any increase
+    """
+    regressions = []
+    for name, result in results.items():
+        if name not in baseline:
+            continue
+        before = baseline[name]
+        if result["p50_ms"] > before["p50_ms"] * (1 + tolerance):
+            regressions.append(
+                f'{name}: p50 {before["p50_ms"]}ms -> {result["p50_ms"]}ms'
+            )
+        if result["statements"] > before["statements"]:
+            regressions.append(
+                f'{name}: statements {before["statements"]} -> '
+                f'{result["statements"]}'
+            )
+    return regressions
+
+
+def report(results, baseline=None):
+    print(f'{"scenario":<34}{"p50 ms":>10}{"p95 ms":>10}{"sql":>6}')
+    for name, result in results.items():
+        line = (
+            f"{name:<34}{result['p50_ms']:>10.2f}"
+            f"{result['p95_ms']:>10.2f}{result['statements']:>6}"
+        )
+        if baseline and name in baseline:
+            before = baseline[name]
+            line += (
+                f"   (was {before['p50_ms']:.2f} / "
+                f"{before['p95_ms']:.2f} / {before['statements']})"
+            )
+        print(line)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--iterations", type=int, default=20)
+    parser.add_argument("--warmup", type=int, default=2)
+    parser.add_argument("--users", type=int, default=10)
+    parser.add_argument("--days", type=int, default=365)
+    parser.add_argument("--foods", type=int, default=100)
+    parser.add_argument(
+        "--no-seed",
+        action="store_true",
+        help="reuse the existing benchmark database",
+    )
+    parser.add_argument("--save", help="write the results to this file")
+    parser.add_argument("--compare", help="baseline file to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.2)
+    args = parser.parse_args()
+
+    app = create_app(BenchmarkConfig)
+    if not args.no_seed:
+        with app.app_context():
+            db.drop_all()
+            db.create_all()
+            seed(users=args.users, days=args.days, foods_per_list=args.foods)
+            db.session.remove()
+
+    results = run(app, args.iterations, args.warmup)
+    baseline = None
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+    report(results, baseline)
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump(results, f, indent=2, sort_keys=True)
+    if baseline:
+        regressions = compare(results, baseline, args.tolerance)
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,215 @@
+"""
+Fills the database with a deterministic data set for the benchmarks
+
+    python -m benchmarks.seed --users 50 --lists 2 --days 730 --shares 1
+"""
+
+import argparse
+import random
+from datetime import date, timedelta
+from werkzeug.security import generate_password_hash
+from app import db, create_app
+from app.models import (
+    User,
+    List,
+    ListPermission,
+    ListSettings,
+    Meal,
+    Day,
+    Entry,
+    Food,
+    FoodCategory,
+    FoodCategoryAssociation,
+    Ingredient,
+)
+from benchmarks import BenchmarkConfig
+
+PASSWORD = "Benchmark1234"
+MEALS = ["Breakfast", "Lunch", "Dinner", "Snack", "Supper", "Dessert"]
+
+
+def insert(model, rows, chunk=500):
+    for i in range(0, len(rows), chunk):
+        db.session.execute(model.__table__.insert(), rows[i : i + chunk])
+
+
+def seed(
+    users=10,
+    lists_per_user=2,
+    days=365,
+    foods_per_list=100,
+    categories_per_list=10,
+    shares_per_list=1,
+    meals_per_list=3,
+    random_seed=0,
+):
+    """
+    Creates users with lists shared to other users, meals, a history
+    of days and entries centered on today and a food catalogue with
+    categories and ingredients
+
+    Ids are assigned in insertion order, starting at 1 on an empty database
+    """
+    rnd = random.Random(random_seed)
+    password = generate_password_hash(PASSWORD)
+    insert(
+        User,
+        [
+            {
+                "id": u,
+                "username": f"user{u}",
+                "email": f"user{u}@example.com",
+                "password": password,
+                "is_confirmed": True,
+                "is_admin": False,
+            }
+            for u in range(1, users + 1)
+        ],
+    )
+    list_ids = range(1, users * lists_per_user + 1)
+    owner = {l: (l - 1) // lists_per_user + 1 for l in list_ids}
+    insert(List, [{"id": l, "name": f"List {l}"} for l in list_ids])
+    members = {
+        l: [
+            (owner[l] + s - 1) % users + 1
+            for s in range(1, min(shares_per_list, users - 1) + 1)
+        ]
+        for l in list_ids
+    }
+    insert(
+        ListPermission,
+        [
+            {"list_id": l, "user_id": owner[l], "permission_level": "owner"}
+            for l in list_ids
+        ]
+        + [
+            {"list_id": l, "user_id": u, "permission_level": "member"}
+            for l in list_ids
+            for u in members[l]
+        ],
+    )
+    insert(
+        ListSettings,
+        [
+            {
+                "list_id": l,
+                "user_id": u,
+                "start_day_of_week": -1,
+                "days_to_display": 7,
+            }
+            for l in list_ids
+            for u in [owner[l]] + members[l]
+        ],
+    )
+    meal_ids = {}
+    meals = []
+    for l in list_ids:
+        for order, name in enumerate(MEALS[:meals_per_list]):
+            meals.append(
+                {
+                    "id": len(meals) + 1,
+                    "list_id": l,
+                    "name": name,
+                    "order": order,
+                }
+            )
+            meal_ids.setdefault(l, []).append(len(meals))
+    insert(Meal, meals)
+
+    foods = {}
+    food_rows = []
+    category_rows = []
+    association_rows = []
+    ingredient_rows = []
+    for l in list_ids:
+        first_category = len(category_rows) + 1
+        for c in range(categories_per_list):
+            category_rows.append(
+                {
+                    "id": len(category_rows) + 1,
+                    "list_id": l,
+                    "name": f"Category {c}",
+                }
+            )
+        for f in range(foods_per_list):
+            food_id = len(food_rows) + 1
+            food_rows.append(
+                {"id": food_id, "list_id": l, "name": f"Food {f}"}
+            )
+            foods.setdefault(l, []).append(f"Food {f}")
+            ingredient_rows += [
+                {"food_id": food_id, "name": f"Ingredient {i}"}
+                for i in rnd.sample(range(50), 3)
+            ]
+            if categories_per_list:
+                for c in rnd.sample(
+                    range(categories_per_list), min(2, categories_per_list)
+                ):
+                    association_rows.append(
+                        {"food_id": food_id, "category_id": first_category + c}
+                    )
+    insert(FoodCategory, category_rows)
+    insert(Food, food_rows)
+    insert(FoodCategoryAssociation, association_rows)
+    insert(Ingredient, ingredient_rows)
+
+    first = date.today() - timedelta(days=days // 2)
+    day_rows = []
+    entry_rows = []
+    for l in list_ids:
+        for i in range(days):
+            day_id = len(day_rows) + 1
+            day_rows.append(
+                {"id": day_id, "list_id": l, "day": first + timedelta(days=i)}
+            )
+            for meal_id in meal_ids[l]:
+                entry_rows.append(
+                    {
+                        "day_id": day_id,
+                        "meal_id": meal_id,
+                        "value": rnd.choice(foods[l]) if foods.get(l) else "",
+                    }
+                )
+    insert(Day, day_rows)
+    insert(Entry, entry_rows)
+    db.session.commit()
+    return {
+        "users": users,
+        "lists": len(list_ids),
+        "shares": sum(len(m) for m in members.values()),
+        "days": len(day_rows),
+        "entries": len(entry_rows),
+        "foods": len(food_rows),
+        "categories": len(category_rows),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--users", type=int, default=10)
+    parser.add_argument("--lists", type=int, default=2)
+    parser.add_argument("--days", type=int, default=365)
+    parser.add_argument("--foods", type=int, default=100)
+    parser.add_argument("--categories", type=int, default=10)
+    parser.add_argument("--shares", type=int, default=1)
+    parser.add_argument("--meals", type=int, default=3)
+    args = parser.parse_args()
+    app = create_app(BenchmarkConfig)
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+        print(
+            seed(
+                args.users,
+                args.lists,
+                args.days,
+                args.foods,
+                args.categories,
+                args.shares,
+                args.meals,
+            )
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+"""
+Times serializing the entries of a 25 day window for several lists with
+6 meals each, building Entry objects against the column-only rows the
+listings read
+
+    python -m benchmarks.serialize --lists 8 --iterations 50
+"""
+
+import argparse
+import time
+from app import db, create_app
+from app.models import List, ListSettings
+from benchmarks import BenchmarkConfig
+from benchmarks.run import count_statements, percentile
+from benchmarks.seed import seed
+
+DAYS = 25
+MEALS = 6
+SETTINGS = ListSettings(start_day_of_week=-1, days_to_display=DAYS)
+
+
+def window(l):
+    return l.get_days(list_settings=SETTINGS)
+
+
+def orm_entries(lists):
+    return [
+        e.to_dict()
+        for l in lists
+        for day in l.get_or_create_entries(window(l))
+        for e in day
+    ]
+
+
+def row_entries(lists):
+    return [
+        e.to_dict()
+        for l in lists
+        for day in l.get_entries(window(l))
+        for e in day
+    ]
+
+
+# (name, function serializing the entries of lists)
+SCENARIOS = [
+    ("Entry objects", orm_entries),
+    ("column rows", row_entries),
+]
+
+
+def run(app, list_ids, iterations=20, warmup=2):
+    """
+    Returns {scenario: {"p50_ms", "p95_ms", "statements", "entries"}},
+    every iteration starts from an empty session like a request does
+    """
+    results = {}
+    with app.app_context():
+        for name, scenario in SCENARIOS:
+            timings = []
+            for i in range(warmup + iterations):
+                db.session.remove()
+                lists = List.query.filter(List.id.in_(list_ids)).all()
+                with count_statements(db.engine) as count:
+                    start = time.perf_counter()
+                    entries = scenario(lists)
+                    elapsed = time.perf_counter() - start
+                if i >= warmup:
+                    timings.append(elapsed * 1000)
+            results[name] = {
+                "p50_ms": round(percentile(timings, 0.5), 3),
+                "p95_ms": round(percentile(timings, 0.95), 3),
+                "statements": count[0],
+                "entries": len(entries),
+            }
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--lists", type=int, default=4)
+    parser.add_argument("--iterations", type=int, default=20)
+    parser.add_argument("--warmup", type=int, default=2)
+    args = parser.parse_args()
+
+    app = create_app(BenchmarkConfig)
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+        seed(
+            users=args.lists,
+            lists_per_user=1,
+            days=2 * DAYS,
+            foods_per_list=50,
+            meals_per_list=MEALS,
+        )
+        db.session.remove()
+
+    results = run(app, list(range(1, args.lists + 1)), args.iterations)
+    print(
+        f'{"serializer":<16}{"p50 ms":>10}{"p95 ms":>10}{"sql":>6}'
+        f'{"entries":>9}'
+    )
+    for name, result in results.items():
+        print(
+            f"{name:<16}{result['p50_ms']:>10.2f}{result['p95_ms']:>10.2f}"
+            f"{result['statements']:>6}{result['entries']:>9}"
+        )
+
+
+if __name__ == "__main__":
+    main()
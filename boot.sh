@@ -8,4 +8,8 @@ while true; do
    echo Upgrade command failed, retrying in 5 secs...
    sleep 5
 done
-exec gunicorn -b :5000 --access-logfile - --error-logfile - foodlist:app
\ No newline at end of file
+# workers share their metrics through this directory, start from scratch
+export PROMETHEUS_MULTIPROC_DIR=${PROMETHEUS_MULTIPROC_DIR:-/tmp/foodlist-metrics}
+rm -rf "$PROMETHEUS_MULTIPROC_DIR"
+mkdir -p "$PROMETHEUS_MULTIPROC_DIR"
+exec gunicorn -c gunicorn.conf.py -b :5000 --access-logfile - --error-logfile - foodlist:app
\ No newline at end of file
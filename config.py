@@ -15,3 +15,25 @@ class Config(object):
   MAIL_PORT = os.environ.get('MAIL_PORT') or 587
   MAIL_USE_TLS = os.environ.get('MAIL_USE_TLS') or True
   APPLICATION_NAME = 'Foodlist'
+  # build days and entries in memory on read instead of inserting rows
+  VIRTUAL_DAYS = bool(os.environ.get('VIRTUAL_DAYS'))
+  # log statement counts and database time per request, see
+  # app/service/instrumentation.py
+  SQL_INSTRUMENTATION = bool(os.environ.get('SQL_INSTRUMENTATION'))
+  SLOW_QUERY_THRESHOLD_MS = float(
+      os.environ.get('SLOW_QUERY_THRESHOLD_MS') or 100)
+  # cache list reads: null, memory (per process) or shared (a directory
+  # all workers use, keep it on a tmpfs)
+  RESPONSE_CACHE = os.environ.get('RESPONSE_CACHE') or 'null'
+  RESPONSE_CACHE_SIZE = int(os.environ.get('RESPONSE_CACHE_SIZE') or 1000)
+  RESPONSE_CACHE_DIR = os.environ.get('RESPONSE_CACHE_DIR') or \
+    '/dev/shm/foodlist-cache'
+  # food autocomplete: memory (a trigram index per process) or pg_trgm
+  # (postgresql only, see the ix_foods_name_trgm migration)
+  FOOD_SEARCH = os.environ.get('FOOD_SEARCH') or 'memory'
+  # seconds before the memory index counts food usage again, in a thread
+  FOOD_SEARCH_USES_MAX_AGE = int(
+      os.environ.get('FOOD_SEARCH_USES_MAX_AGE') or 300)
+  # library jsonify encodes with: auto (orjson, then ujson, if installed),
+  # orjson, ujson or json
+  JSON_BACKEND = os.environ.get('JSON_BACKEND') or 'auto'
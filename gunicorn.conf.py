@@ -0,0 +1,6 @@
+from prometheus_client import multiprocess
+
+
+def child_exit(server, worker):
+    # drop the live gauges of workers that are gone
+    multiprocess.mark_process_dead(worker.pid)
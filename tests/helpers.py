@@ -1,4 +1,6 @@
 import unittest
+from contextlib import contextmanager
+from sqlalchemy import event
 from app import db, create_app
 from app.models import User, List, ListPermission
 from config import Config
@@ -6,7 +8,7 @@ from config import Config
 
 class APITestCase(unittest.TestCase):
     def setUp(self):
-        self.app = create_app(TestConfig)
+        self.app = create_app(getattr(self, 'config_class', TestConfig))
         self.app_context = self.app.app_context()
         self.app_context.push()
         self.test_client = self.app.test_client()
@@ -72,6 +74,21 @@ def push_dummy_list(user, name, level="owner"):
     return list_
 
 
+@contextmanager
+def count_queries():
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    event.listen(db.engine, 'before_cursor_execute', before_cursor_execute)
+    try:
+        yield statements
+    finally:
+        event.remove(db.engine, 'before_cursor_execute',
+                     before_cursor_execute)
+
+
 class TestConfig(Config):
     TESTING = True
     SQLALCHEMY_DATABASE_URI = 'sqlite://'
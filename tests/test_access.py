@@ -0,0 +1,43 @@
+from app import db
+from app.models import ListPermission, Day, Entry, Meal
+from app.service.access import get_permission_level, get_entry_access
+from helpers import (push_dummy_user, push_dummy_list, count_queries,
+                     AppModelCase)
+
+
+class AccessCase(AppModelCase):
+
+    def test_get_permission_level(self):
+        u = push_dummy_user()
+        v = push_dummy_user('v', 'v')
+        w = push_dummy_user('w', 'w')
+        list_ = push_dummy_list(u, 'list_')
+        db.session.add(ListPermission(list_id=list_.id, user_id=v.id,
+                                      permission_level='member'))
+        db.session.commit()
+        list_id, user_id = list_.id, u.id
+        with count_queries() as queries:
+            self.assertEqual(get_permission_level(list_id, user_id), 'owner')
+        self.assertEqual(len(queries), 1)
+        self.assertEqual(get_permission_level(list_.id, v.id), 'member')
+        self.assertIsNone(get_permission_level(list_.id, w.id))
+        self.assertIsNone(get_permission_level(list_.id + 1, u.id))
+
+    def test_get_entry_access(self):
+        u = push_dummy_user()
+        v = push_dummy_user('v', 'v')
+        list_ = push_dummy_list(u, 'list_')
+        meal = Meal(list_id=list_.id, name='Lunch', order=0)
+        day = Day(list_id=list_.id, day=db.func.current_date())
+        db.session.add_all([meal, day])
+        db.session.commit()
+        entry = Entry(day_id=day.id, meal_id=meal.id, value='')
+        db.session.add(entry)
+        db.session.commit()
+        entry_id, list_id, user_id = entry.id, list_.id, u.id
+        with count_queries() as queries:
+            self.assertEqual(get_entry_access(entry_id, user_id),
+                             (list_id, 'owner'))
+        self.assertEqual(len(queries), 1)
+        self.assertEqual(get_entry_access(entry.id, v.id), (list_.id, None))
+        self.assertIsNone(get_entry_access(entry.id + 1, u.id))
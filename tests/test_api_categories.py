@@ -92,6 +92,19 @@ class APIFoodCategoryCase(APITestCase):
             data = rsp.get_json()
             self.assertEqual(rsp.status, '404 NOT FOUND')
 
+    def test_delete_category_of_other_list(self):
+        u = push_dummy_user()
+        push_dummy_list(u, 'TestyList')
+        other = push_dummy_user('other@doodlydoo.com', 'other')
+        push_dummy_list(other, 'OtherList')
+        db.session.add(FoodCategory(list_id=2, name='OtherCat'))
+        db.session.commit()
+        with self.test_client:
+            self.login(u.username)
+            rsp = self.test_client.delete('/api/lists/1/categories/1')
+            self.assertEqual(rsp.status, '404 NOT FOUND')
+            self.assertEqual(FoodCategory.query.count(), 1)
+
     def test_get_category_by_food(self):
         u = push_dummy_user()
         push_dummy_list(u, 'TestyList')
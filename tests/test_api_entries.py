@@ -1,8 +1,11 @@
+from datetime import date, timedelta
 from app import db
-from app.models import ListPermission, User
+from app.models import ListPermission, User, Day, Entry
 from helpers import (push_dummy_user,
                      push_dummy_list,
-                     APITestCase)
+                     count_queries,
+                     APITestCase,
+                     TestConfig)
 
 
 class APIEntriesCase(APITestCase):
@@ -183,3 +186,193 @@ class APIEntriesCase(APITestCase):
                 value='Test'
             ))
             self.assertEqual(rsp.status, '400 BAD REQUEST')
+
+
+class APIBatchEntriesCase(APITestCase):
+
+    def test_patch_entries(self):
+        u = push_dummy_user()
+        push_dummy_list(u, 'TestyList')
+        with self.test_client:
+            self.login(u.username)
+            data = self.test_client.get('/api/lists/1/entries').get_json()
+            tomorrow = (date.today() + timedelta(days=1)).isoformat()
+            far = (date.today() + timedelta(days=100)).isoformat()
+            with count_queries() as statements:
+                rsp = self.test_client.patch('/api/lists/1/entries', json=[
+                    {'id': data[0]['id'], 'value': 'Pasta'},
+                    {'day': tomorrow, 'meal_id': 2, 'value': 'Soup'},
+                    {'day': far, 'meal_id': 1, 'value': 'Cake'},
+                    {'id': data[0]['id'], 'value': 'Pizza'},
+                ])
+            self.assertEqual(rsp.status, '200 OK')
+            self.assertEqual(rsp.get_json(), [
+                {'key': 'Lunch', 'id': data[0]['id'], 'value': 'Pizza'},
+                {'key': 'Dinner', 'id': data[3]['id'], 'value': 'Soup'},
+                {'key': 'Lunch', 'id': 15, 'value': 'Cake'},
+            ])
+            self.assertEqual(
+                len([i for i in statements if i.startswith('UPDATE entry')]),
+                1)
+            data = self.test_client.get('/api/lists/1/entries').get_json()
+            self.assertEqual(data[0]['value'], 'Pizza')
+            self.assertEqual(data[3]['value'], 'Soup')
+            self.assertEqual(Entry.query.filter_by(value='Cake').count(), 1)
+
+    def test_patch_entries_access(self):
+        u = push_dummy_user()
+        other = push_dummy_user(email='test', username='test')
+        push_dummy_list(u, 'TestyList')
+        push_dummy_list(other, 'OtherList')
+        with self.test_client:
+            self.login(other.username)
+            other_entry = self.test_client.get(
+                '/api/lists/2/entries').get_json()[0]['id']
+            self.logout()
+            self.login(u.username)
+            entry = self.test_client.get(
+                '/api/lists/1/entries').get_json()[0]['id']
+            rsp = self.test_client.patch('/api/lists/1/entries', json=[
+                {'id': entry, 'value': 'Pasta'},
+                {'id': other_entry, 'value': 'Pasta'},
+            ])
+            self.assertEqual(rsp.status, '404 NOT FOUND')
+            # meal 1 belongs to the other list
+            for meal_id in [1, 99]:
+                rsp = self.test_client.patch('/api/lists/1/entries', json=[
+                    {'day': date.today().isoformat(), 'meal_id': meal_id,
+                     'value': 'Pasta'},
+                ])
+                self.assertEqual(rsp.status, '404 NOT FOUND')
+            rsp = self.test_client.patch('/api/lists/2/entries', json=[
+                {'id': other_entry, 'value': 'Pasta'},
+            ])
+            self.assertEqual(rsp.status, '403 FORBIDDEN')
+            self.assertEqual(Entry.query.filter_by(value='Pasta').count(), 0)
+
+    def test_patch_entries_validation(self):
+        u = push_dummy_user()
+        push_dummy_list(u, 'TestyList')
+        with self.test_client:
+            self.login(u.username)
+            for body in [{'value': 'x'}, [{'id': 1}], [{'value': 'x'}],
+                         [{'day': 'yesterday', 'meal_id': 1, 'value': 'x'}],
+                         [{'day': '2020-01-01', 'meal_id': '1', 'value': 'x'}],
+                         [{'id': 1, 'value': 'x'}] * 501]:
+                rsp = self.test_client.patch('/api/lists/1/entries',
+                                             json=body)
+                self.assertEqual(rsp.status, '400 BAD REQUEST', body)
+
+            entries = self.test_client.get('/api/lists/1/entries').get_json()
+            self.test_client.patch('/api/lists/1/entries', json=[
+                {'id': entries[0]['id'], 'value': 'Kept'}])
+            rsp = self.test_client.patch('/api/lists/1/entries',
+                                         json=[{'id': True, 'value': ''}])
+            self.assertEqual(rsp.status, '404 NOT FOUND')
+            self.assertEqual(Entry.query.get(entries[0]['id']).value, 'Kept')
+
+
+class VirtualDaysConfig(TestConfig):
+    VIRTUAL_DAYS = True
+
+
+class APIVirtualEntriesCase(APITestCase):
+    config_class = VirtualDaysConfig
+
+    def test_get_does_not_write(self):
+        u = push_dummy_user()
+        push_dummy_list(u, 'TestyList')
+        with self.test_client:
+            self.login(u.username)
+            rsp = self.test_client.get('/api/entries')
+            data = rsp.get_json()
+            self.assertEqual(rsp.status, '200 OK')
+            self.assertEqual(len(data), 14)
+            today = date.today().strftime('%Y%m%d')
+            self.assertEqual(
+                data[0], {'key': 'Lunch', 'id': f'1-{today}-1', 'value': ''})
+
+            rsp = self.test_client.get('/api/days?offset=-5000')
+            self.assertEqual(rsp.status, '200 OK')
+            rsp = self.test_client.get('/api/lists/1/days')
+            data = rsp.get_json()
+            self.assertEqual(data[0]['id'], f'1-{today}')
+            self.assertEqual(data[0]['entries'],
+                             [f'1-{today}-1', f'1-{today}-2'])
+            rsp = self.test_client.get('/api/lists')
+            self.assertEqual(rsp.get_json()[0]['days'][0], f'1-{today}')
+            self.assertEqual(Day.query.count(), 0)
+            self.assertEqual(Entry.query.count(), 0)
+
+    def test_patch_virtual_entry(self):
+        u = push_dummy_user()
+        push_dummy_list(u, 'TestyList')
+        with self.test_client:
+            self.login(u.username)
+            data = self.test_client.get('/api/entries').get_json()
+            virtual_id = data[1]['id']
+
+            rsp = self.test_client.patch(f'/api/entries/{virtual_id}',
+                                         json=dict(value=''))
+            self.assertEqual(rsp.status, '200 OK')
+            self.assertEqual(rsp.get_json()['id'], virtual_id)
+            self.assertEqual(Entry.query.count(), 0)
+
+            rsp = self.test_client.patch(f'/api/entries/{virtual_id}',
+                                         json=dict(value='Pasta'))
+            self.assertEqual(rsp.status, '200 OK')
+            self.assertEqual(rsp.get_json(),
+                             {'key': 'Dinner', 'id': 1, 'value': 'Pasta'})
+            self.assertEqual(Day.query.count(), 1)
+            self.assertEqual(Entry.query.count(), 1)
+
+            rsp = self.test_client.patch(f'/api/entries/{virtual_id}',
+                                         json=dict(value='Pizza'))
+            self.assertEqual(rsp.get_json()['id'], 1)
+            self.assertEqual(Entry.query.count(), 1)
+
+            data = self.test_client.get('/api/entries').get_json()
+            self.assertEqual(data[1],
+                             {'key': 'Dinner', 'id': 1, 'value': 'Pizza'})
+            self.assertEqual(data[0]['id'], virtual_id[:-1] + '1')
+
+    def test_virtual_entry_access_control(self):
+        u = push_dummy_user()
+        no_access_user = push_dummy_user(email='test', username='test')
+        push_dummy_list(u, 'TestyList')
+        with self.test_client:
+            self.login(u.username)
+            self.test_client.get('/api/entries')
+            self.logout()
+        today = date.today().strftime('%Y%m%d')
+        with self.test_client:
+            self.login(no_access_user.username)
+            rsp = self.test_client.patch(f'/api/entries/1-{today}-1',
+                                         json=dict(value='Test'))
+            self.assertEqual(rsp.status, '403 FORBIDDEN')
+            rsp = self.test_client.patch(f'/api/entries/1-{today}-5',
+                                         json=dict(value='Test'))
+            self.assertEqual(rsp.status, '404 NOT FOUND')
+            rsp = self.test_client.patch(f'/api/entries/2-{today}-1',
+                                         json=dict(value='Test'))
+            self.assertEqual(rsp.status, '404 NOT FOUND')
+
+    def test_patch_entries_virtual(self):
+        u = push_dummy_user()
+        push_dummy_list(u, 'TestyList')
+        with self.test_client:
+            self.login(u.username)
+            data = self.test_client.get('/api/entries').get_json()
+            rsp = self.test_client.patch('/api/lists/1/entries', json=[
+                {'id': data[0]['id'], 'value': ''},
+                {'id': data[1]['id'], 'value': 'Pasta'},
+            ])
+            self.assertEqual(rsp.status, '200 OK')
+            self.assertEqual(rsp.get_json(), [
+                data[0],
+                {'key': 'Dinner', 'id': 1, 'value': 'Pasta'},
+            ])
+            self.assertEqual(Entry.query.count(), 1)
+            rsp = self.test_client.patch('/api/lists/2/entries', json=[
+                {'id': data[0]['id'], 'value': 'Pasta'}])
+            self.assertEqual(rsp.status, '404 NOT FOUND')
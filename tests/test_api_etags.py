@@ -0,0 +1,98 @@
+from app import db
+from app.models import ListPermission
+from helpers import (push_dummy_user,
+                     push_dummy_list,
+                     count_queries,
+                     APITestCase)
+
+
+class APIETagsCase(APITestCase):
+
+    def assertRevalidates(self, url):
+        rsp = self.test_client.get(url)
+        self.assertEqual(rsp.status, '200 OK')
+        etag = rsp.headers['ETag']
+        with count_queries() as statements:
+            rsp = self.test_client.get(url, headers={'If-None-Match': etag})
+        self.assertEqual(rsp.status, '304 NOT MODIFIED')
+        self.assertEqual(rsp.headers['ETag'], etag)
+        self.assertEqual(rsp.get_data(), b'')
+        return etag, statements
+
+    def test_not_modified(self):
+        u = push_dummy_user()
+        push_dummy_list(u, 'List')
+        with self.test_client:
+            self.login(u.username)
+            for url in ['/api/lists', '/api/days', '/api/entries',
+                        '/api/lists/1', '/api/lists/1/days',
+                        '/api/lists/1/entries', '/api/lists/1/meals',
+                        '/api/lists/1/foods', '/api/lists/1/categories',
+                        '/api/lists/1/shares']:
+                _, statements = self.assertRevalidates(url)
+                self.assertFalse(
+                    [i for i in statements if 'INSERT' in i], url)
+
+    def test_etag_depends_on_arguments_and_user(self):
+        u = push_dummy_user()
+        other = push_dummy_user(email='test', username='test')
+        list_ = push_dummy_list(u, 'List')
+        db.session.add(ListPermission(list_id=list_.id, user_id=other.id,
+                                      permission_level='member'))
+        db.session.commit()
+        with self.test_client:
+            self.login(u.username)
+            days = self.test_client.get('/api/lists/1/days').headers['ETag']
+            offset = self.test_client.get(
+                '/api/lists/1/days?offset=7').headers['ETag']
+            self.assertNotEqual(days, offset)
+            self.logout()
+            self.login(other.username)
+            rsp = self.test_client.get('/api/lists/1/days',
+                                       headers={'If-None-Match': days})
+            self.assertEqual(rsp.status, '200 OK')
+
+    def test_mutations_change_etag(self):
+        u = push_dummy_user()
+        push_dummy_list(u, 'List')
+        with self.test_client:
+            self.login(u.username)
+            entries = self.test_client.get('/api/lists/1/entries')
+            etag = entries.headers['ETag']
+            aggregate, _ = self.assertRevalidates('/api/entries')
+            entry_id = entries.get_json()[0]['id']
+            self.test_client.patch(f'/api/entries/{entry_id}',
+                                   json={'value': 'Pizza'})
+            rsp = self.test_client.get('/api/lists/1/entries',
+                                       headers={'If-None-Match': etag})
+            self.assertEqual(rsp.status, '200 OK')
+            self.assertEqual(rsp.get_json()[0]['value'], 'Pizza')
+            rsp = self.test_client.get('/api/entries',
+                                       headers={'If-None-Match': aggregate})
+            self.assertEqual(rsp.status, '200 OK')
+
+            for method, url, body in [
+                    ('post', '/api/lists/1/meals', {'name': 'Supper'}),
+                    ('post', '/api/lists/1/foods', {'name': 'Pizza'}),
+                    ('post', '/api/lists/1/categories', {'name': 'Fast'}),
+                    ('put', '/api/lists/1/settings',
+                     {'start_day_of_week': 'Monday', 'days_to_display': 7}),
+                    ('patch', '/api/lists/1', {'listname': 'Renamed'})]:
+                etag, _ = self.assertRevalidates('/api/lists/1')
+                rsp = getattr(self.test_client, method)(url, json=body)
+                self.assertLess(rsp.status_code, 400, url)
+                rsp = self.test_client.get('/api/lists/1',
+                                           headers={'If-None-Match': etag})
+                self.assertEqual(rsp.status, '200 OK', url)
+
+    def test_new_list_changes_aggregate_etag(self):
+        u = push_dummy_user()
+        push_dummy_list(u, 'List')
+        with self.test_client:
+            self.login(u.username)
+            etag, _ = self.assertRevalidates('/api/lists')
+            self.test_client.post('/api/lists', json={'listname': 'Second'})
+            rsp = self.test_client.get('/api/lists',
+                                       headers={'If-None-Match': etag})
+            self.assertEqual(rsp.status, '200 OK')
+            self.assertEqual(len(rsp.get_json()), 2)
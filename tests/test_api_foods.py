@@ -1,8 +1,51 @@
+import threading
+from sqlalchemy import event
 from app import db
 from app.models import List, FoodCategory, Food, FoodCategoryAssociation
 from helpers import (push_dummy_user,
                      push_dummy_list,
-                     APITestCase)
+                     count_queries,
+                     APITestCase,
+                     TestConfig)
+
+
+class CountUsesConfig(TestConfig):
+    FOOD_SEARCH_USES_MAX_AGE = 0
+
+
+class APIFoodUsesCase(APITestCase):
+    config_class = CountUsesConfig
+
+    def test_uses_counted_in_background(self):
+        u = push_dummy_user()
+        push_dummy_list(u, 'TestyList')
+        with self.test_client:
+            self.login(u.username)
+            self.test_client.post('/api/lists/1/foods',
+                                  json={'name': 'Pasta'})
+            self.test_client.get('/api/lists/1/foods/search?q=pa')
+            entries = self.test_client.get(
+                '/api/lists/1/entries').get_json()
+            self.test_client.patch('/api/lists/1/entries', json=[
+                {'id': entries[0]['id'], 'value': 'Pasta'}])
+
+            counted_on = []
+
+            def record_thread(conn, cursor, statement, *args):
+                if 'GROUP BY' in statement:
+                    counted_on.append(threading.get_ident())
+
+            event.listen(db.engine, 'before_cursor_execute', record_thread)
+            try:
+                self.test_client.get('/api/lists/1/foods/search?q=pa')
+                self.app.extensions['food_search'][0][1].refresher.join()
+            finally:
+                event.remove(db.engine, 'before_cursor_execute',
+                             record_thread)
+            self.assertTrue(counted_on)
+            self.assertNotIn(threading.get_ident(), counted_on)
+            rsp = self.test_client.get('/api/lists/1/foods/search?q=pa')
+            self.assertEqual(rsp.get_json()[0]['uses'], 1)
 
 
 class APIFoodCase(APITestCase):
@@ -196,3 +239,252 @@ class APIFoodCase(APITestCase):
                 ]
             ))
             self.assertEqual(rsp.status, '404 NOT FOUND')
+
+    def test_search_foods(self):
+        u = push_dummy_user()
+        push_dummy_list(u, 'TestyList')
+        with self.test_client:
+            self.login(u.username)
+            for name in ['Pasta Carbonara', 'Tomato Pasta', 'Pastrami',
+                         'Spaghetti', 'Antipasti', 'Pie']:
+                self.test_client.post('/api/lists/1/foods',
+                                      json={'name': name})
+            entries = self.test_client.get(
+                '/api/lists/1/entries').get_json()
+            self.test_client.patch('/api/lists/1/entries', json=[
+                {'id': entries[0]['id'], 'value': 'pastrami'},
+                {'id': entries[1]['id'], 'value': 'Pastrami'},
+                {'id': entries[2]['id'], 'value': 'Antipasti'},
+            ])
+
+            rsp = self.test_client.get('/api/lists/1/foods/search?q=past')
+            self.assertEqual(rsp.status, '200 OK')
+            self.assertEqual(rsp.get_json(), [
+                {'id': 3, 'name': 'Pastrami', 'uses': 2},
+                {'id': 1, 'name': 'Pasta Carbonara', 'uses': 0},
+                {'id': 2, 'name': 'Tomato Pasta', 'uses': 0},
+                {'id': 5, 'name': 'Antipasti', 'uses': 1},
+            ])
+            rsp = self.test_client.get(
+                '/api/lists/1/foods/search?q=TI&limit=2')
+            self.assertEqual([i['name'] for i in rsp.get_json()],
+                             ['Antipasti', 'Spaghetti'])
+
+            self.test_client.put('/api/lists/1/foods/4', json={
+                'name': 'Pasta Bake', 'categories': []})
+            self.test_client.delete('/api/lists/1/foods/3')
+            rsp = self.test_client.get('/api/lists/1/foods/search?q=pasta')
+            self.assertEqual([i['name'] for i in rsp.get_json()],
+                             ['Pasta Bake', 'Pasta Carbonara',
+                              'Tomato Pasta'])
+            rsp = self.test_client.get('/api/lists/1/foods/search?q=')
+            self.assertEqual(rsp.get_json(), [])
+            rsp = self.test_client.get(
+                '/api/lists/1/foods/search?q=a&limit=100')
+            self.assertEqual(rsp.status, '400 BAD REQUEST')
+
+    def test_search_after_entry_write_keeps_index(self):
+        u = push_dummy_user()
+        push_dummy_list(u, 'TestyList')
+        with self.test_client:
+            self.login(u.username)
+            self.test_client.post('/api/lists/1/foods',
+                                  json={'name': 'Pasta'})
+            self.test_client.get('/api/lists/1/foods/search?q=pa')
+            entries = self.test_client.get(
+                '/api/lists/1/entries').get_json()
+            self.test_client.patch('/api/lists/1/entries', json=[
+                {'id': entries[0]['id'], 'value': 'Pasta'}])
+
+            with count_queries() as statements:
+                rsp = self.test_client.get('/api/lists/1/foods/search?q=pa')
+            self.assertEqual(rsp.get_json(),
+                             [{'id': 1, 'name': 'Pasta', 'uses': 0}])
+            self.assertFalse([i for i in statements
+                              if 'FROM foods' in i or 'GROUP BY' in i])
+
+            self.test_client.post('/api/lists/1/foods',
+                                  json={'name': 'Paella'})
+            self.test_client.put('/api/lists/1/foods/1',
+                                 json={'name': 'Pasta Bake',
+                                       'categories': []})
+            self.test_client.put('/api/lists/1/foods', json={'ops': [
+                {'op': 'create', 'name': 'Panzanella'},
+                {'op': 'delete', 'id': 2}]})
+            # food writes are caught up on without loading the catalogue
+            with count_queries() as statements:
+                rsp = self.test_client.get('/api/lists/1/foods/search?q=pa')
+            self.assertEqual([i['name'] for i in rsp.get_json()],
+                             ['Panzanella', 'Pasta Bake'])
+            self.assertFalse([i for i in statements if 'FROM foods' in i])
+
+    def test_foods_load_categories_in_one_query(self):
+        u = push_dummy_user()
+        push_dummy_list(u, 'TestyList')
+        with self.test_client:
+            self.login(u.username)
+            for idx in range(5):
+                self.test_client.put(
+                    '/api/lists/1/foods/%d' % self.test_client.post(
+                        '/api/lists/1/foods?return=food',
+                        json={'name': 'Food%d' % idx}).get_json()['id'],
+                    json={'name': 'Food%d' % idx,
+                          'categories': ['Cat%d' % idx, 'Shared']})
+            with count_queries() as statements:
+                data = self.test_client.get(
+                    '/api/lists/1/foods').get_json()
+            self.assertEqual(len(data), 5)
+            self.assertEqual(data[4]['categories'], [6, 2])
+            self.assertEqual(
+                len([i for i in statements if 'foodcategoryassociation' in i]),
+                1)
+            self.assertFalse([i for i in statements
+                              if 'FROM foodcategories' in i])
+
+    def test_return_only_changed_food(self):
+        u = push_dummy_user()
+        push_dummy_list(u, 'TestyList')
+        with self.test_client:
+            self.login(u.username)
+            self.test_client.post('/api/lists/1/foods', json={'name': 'A'})
+            rsp = self.test_client.post('/api/lists/1/foods?return=food',
+                                        json={'name': 'B'})
+            self.assertEqual(rsp.status, '201 CREATED')
+            self.assertEqual(rsp.get_json(),
+                             {'id': 2, 'name': 'B', 'categories': []})
+            rsp = self.test_client.put('/api/lists/1/foods/2?return=food',
+                                       json={'name': 'C',
+                                             'categories': ['Cat']})
+            self.assertEqual(rsp.get_json(),
+                             {'id': 2, 'name': 'C', 'categories': [1]})
+            rsp = self.test_client.delete(
+                '/api/lists/1/foods/2?return=food')
+            self.assertEqual(rsp.get_json(),
+                             {'id': 2, 'name': 'C', 'categories': [1]})
+            rsp = self.test_client.get('/api/lists/1/foods')
+            self.assertEqual([i['name'] for i in rsp.get_json()], ['A'])
+
+    def test_put_food_rejects_bad_categories(self):
+        u = push_dummy_user()
+        push_dummy_list(u, 'TestyList')
+        with self.test_client:
+            self.login(u.username)
+            self.test_client.post('/api/lists/1/foods', json={'name': 'A'})
+            for categories in [[{'a': 1}], [1], [''], 'Cat', None]:
+                rsp = self.test_client.put(
+                    '/api/lists/1/foods/1',
+                    json={'name': 'A', 'categories': categories})
+                self.assertEqual(rsp.status, '400 BAD REQUEST', categories)
+
+    def test_put_food_many_categories(self):
+        u = push_dummy_user()
+        push_dummy_list(u, 'TestyList')
+        with self.test_client:
+            self.login(u.username)
+            self.test_client.post('/api/lists/1/foods', json={'name': 'F'})
+            names = ['Cat%d' % i for i in range(100)]
+            with count_queries() as statements:
+                rsp = self.test_client.put(
+                    '/api/lists/1/foods/1?return=food',
+                    json={'name': 'F', 'categories': names})
+            self.assertEqual(rsp.get_json()['categories'],
+                             list(range(1, 101)))
+            self.assertEqual(
+                len([i for i in statements if i.startswith('INSERT')]), 2)
+
+            with count_queries() as statements:
+                rsp = self.test_client.put(
+                    '/api/lists/1/foods/1?return=food',
+                    json={'name': 'F', 'categories': names[50:] + ['New']})
+            self.assertEqual(rsp.get_json()['categories'],
+                             list(range(51, 102)))
+            self.assertEqual(
+                len([i for i in statements if i.startswith('DELETE')]), 1)
+            self.assertEqual(FoodCategory.query.count(), 101)
+
+
+class APIBatchFoodsCase(APITestCase):
+    def setUp(self):
+        super().setUp()
+        self.u = push_dummy_user()
+        push_dummy_list(self.u, 'TestyList')
+
+    def put(self, body):
+        return self.test_client.put('/api/lists/1/foods', json=body)
+
+    def test_put_desired_state(self):
+        with self.test_client:
+            self.login(self.u.username)
+            for name in ['A', 'B', 'C']:
+                self.test_client.post('/api/lists/1/foods',
+                                      json={'name': name})
+            rsp = self.put({'foods': [
+                {'name': 'A'},
+                {'id': 2, 'name': 'B2', 'categories': ['X']},
+                {'name': 'D', 'categories': ['X', 'Y']},
+            ]})
+            self.assertEqual(rsp.status, '200 OK')
+            data = rsp.get_json()
+            self.assertEqual([(i['name'], i['categories'])
+                              for i in data['created']], [('D', [1, 2])])
+            self.assertEqual(data['updated'],
+                             [{'id': 2, 'name': 'B2', 'categories': [1]}])
+            self.assertEqual(data['deleted'], [3])
+            # sending the same state again changes nothing
+            rsp = self.put({'foods': [
+                {'name': 'A'},
+                {'name': 'B2', 'categories': ['X']},
+                {'name': 'D', 'categories': ['X', 'Y']},
+            ]})
+            self.assertEqual(rsp.get_json(),
+                             {'created': [], 'updated': [], 'deleted': []})
+            rsp = self.test_client.get('/api/lists/1/foods')
+            self.assertEqual([i['name'] for i in rsp.get_json()],
+                             ['A', 'B2', 'D'])
+
+    def test_put_ops(self):
+        with self.test_client:
+            self.login(self.u.username)
+            for name in ['A', 'B', 'C']:
+                self.test_client.post('/api/lists/1/foods',
+                                      json={'name': name})
+            with count_queries() as statements:
+                rsp = self.put({'ops': [
+                    {'op': 'rename', 'id': 1, 'name': 'B'},
+                    {'op': 'rename', 'id': 2, 'name': 'A'},
+                    {'op': 'delete', 'id': 3},
+                    {'op': 'categories', 'id': 1, 'categories': ['X']},
+                ] + [{'op': 'create', 'name': 'New%d' % i}
+                     for i in range(200)]})
+            self.assertEqual(rsp.status, '200 OK')
+            data = rsp.get_json()
+            self.assertEqual(len(data['created']), 200)
+            self.assertEqual(data['updated'], [
+                {'id': 1, 'name': 'B', 'categories': [1]},
+                {'id': 2, 'name': 'A', 'categories': []},
+            ])
+            self.assertEqual(data['deleted'], [3])
+            self.assertLess(len(statements), 30)
+
+    def test_put_foods_errors(self):
+        with self.test_client:
+            self.login(self.u.username)
+            for name in ['A', 'B']:
+                self.test_client.post('/api/lists/1/foods',
+                                      json={'name': name})
+            rsp = self.put({'ops': [{'op': 'rename', 'id': 1, 'name': 'B'}]})
+            self.assertEqual(rsp.status, '400 BAD REQUEST')
+            rsp = self.put({'ops': [{'op': 'create', 'name': 'A'}]})
+            self.assertEqual(rsp.status, '400 BAD REQUEST')
+            rsp = self.put({'ops': [{'op': 'delete', 'id': 99}]})
+            self.assertEqual(rsp.status, '404 NOT FOUND')
+            rsp = self.put({'ops': [{'op': 'explode', 'id': 1}]})
+            self.assertEqual(rsp.status, '400 BAD REQUEST')
+            rsp = self.put({'foods': [{'name': 'A'}, {'id': 1,
+                                                      'name': 'A'}]})
+            self.assertEqual(rsp.status, '400 BAD REQUEST')
+            rsp = self.put({'foods': [], 'ops': []})
+            self.assertEqual(rsp.status, '400 BAD REQUEST')
+            rsp = self.test_client.get('/api/lists/1/foods')
+            self.assertEqual([i['name'] for i in rsp.get_json()],
+                             ['A', 'B'])
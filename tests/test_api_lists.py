@@ -3,10 +3,50 @@ from app import db
 from app.models import List, ListPermission
 from helpers import (push_dummy_user,
                      push_dummy_list,
+                     count_queries,
                      APITestCase)
 
 
 class APIListsCase(APITestCase):
+    def test_get_grid(self):
+        u = push_dummy_user()
+        push_dummy_list(u, 'TestyList')
+        with self.test_client:
+            self.login(u.username)
+            rsp = self.test_client.get('/api/lists/1/grid')
+            self.assertEqual(rsp.status, '200 OK')
+            data = rsp.get_json()
+            today = date.today()
+            self.assertEqual(len(data['dates']), 7)
+            self.assertEqual(data['dates'][0], today.isoformat())
+            self.assertEqual(data['meals'], [{'id': 1, 'name': 'Lunch'},
+                                             {'id': 2, 'name': 'Dinner'}])
+            self.assertEqual(data['values'], [['', '']] * 7)
+            self.assertEqual(data['ids'][0],
+                             [f'1-{today:%Y%m%d}-1', f'1-{today:%Y%m%d}-2'])
+
+            self.test_client.patch(f'/api/entries/1-{today:%Y%m%d}-2',
+                                   json={'value': 'Pasta'})
+            entries = self.test_client.get(
+                '/api/lists/1/entries?offset=1').get_json()
+            self.test_client.patch(f'/api/entries/{entries[0]["id"]}',
+                                   json={'value': 'Soup'})
+            with count_queries() as statements:
+                data = self.test_client.get(
+                    '/api/lists/1/grid').get_json()
+            self.assertEqual(data['values'][0], ['', 'Pasta'])
+            self.assertEqual(data['ids'][0][1], 1)
+            self.assertEqual(
+                len([i for i in statements if 'JOIN (entry' in i]), 1)
+            self.assertFalse([i for i in statements if 'INSERT' in i])
+            data = self.test_client.get(
+                '/api/lists/1/grid?limit=3').get_json()
+            self.assertEqual(len(data['dates']), 3)
+            data = self.test_client.get(
+                '/api/lists/1/grid?offset=1').get_json()
+            self.assertEqual(data['values'][0], ['Soup', ''])
+            self.assertEqual(data['ids'][0][0], entries[0]['id'])
+
     def test_get_lists(self):
         u = push_dummy_user()
         push_dummy_list(u, 'TestyList')
@@ -20,6 +60,52 @@ class APIListsCase(APITestCase):
             self.assertTrue(
                 data[0]['is_owner'])
 
+    def test_get_lists_query_count(self):
+        u = push_dummy_user()
+        other = push_dummy_user(email='test', username='test')
+        push_dummy_list(u, 'First')
+        with self.test_client:
+            self.login(u.username)
+            self.test_client.get('/api/lists')
+            with count_queries() as one_list:
+                self.test_client.get('/api/lists')
+            for name in ['Second', 'Third', 'Fourth']:
+                push_dummy_list(u, name)
+            shared = push_dummy_list(other, 'Shared')
+            db.session.add(ListPermission(list_id=shared.id, user_id=u.id,
+                                          permission_level='member'))
+            db.session.commit()
+            with count_queries() as first_load:
+                rsp = self.test_client.get('/api/lists')
+            data = rsp.get_json()
+            self.assertEqual([i['name'] for i in data],
+                             ['First', 'Second', 'Third', 'Fourth', 'Shared'])
+            self.assertEqual([i['is_owner'] for i in data],
+                             [True, True, True, True, False])
+            self.assertEqual(data[4]['shares'], [5, 6])
+            self.assertEqual(data[1]['meals'], [3, 4])
+            self.assertEqual(len(data[4]['days']), 7)
+            with count_queries() as five_lists:
+                rsp = self.test_client.get('/api/lists')
+            self.assertEqual(rsp.get_json(), data)
+            self.assertEqual(len(one_list), len(five_lists))
+            self.assertLess(len(first_load), 20)
+
+    def test_get_list_loads_rows_once(self):
+        u = push_dummy_user()
+        push_dummy_list(u, 'TestyList')
+        with self.test_client:
+            self.login(u.username)
+            self.test_client.get('/api/lists/1')
+            with count_queries() as queries:
+                rsp = self.test_client.get('/api/lists/1')
+            self.assertEqual(rsp.status, '200 OK')
+            for clause in ['WHERE list.id = ?',
+                           'AND listpermission.user_id = ?',
+                           'FROM listsettings']:
+                self.assertEqual(
+                    len([q for q in queries if clause in q]), 1, clause)
+
     def test_get_lists_offset(self):
         u = push_dummy_user()
         push_dummy_list(u, 'TestyList')
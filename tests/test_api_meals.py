@@ -1,7 +1,8 @@
 from app import db
-from app.models import List, Meal
+from app.models import Entry, List, Meal
 from helpers import (push_dummy_user,
                      push_dummy_list,
+                     count_queries,
                      APITestCase)
 
 
@@ -204,3 +205,41 @@ class APIMealCase(APITestCase):
                 name='SomethingTotallyWrong'
             ))
             self.assertEqual(rsp.status, '400 BAD REQUEST')
+
+    def test_put_meals_reorders_in_bulk(self):
+        u = push_dummy_user()
+        push_dummy_list(u, 'TestyList')
+        with self.test_client:
+            self.login(u.username)
+            meals = self.test_client.get('/api/lists/1/meals').get_json()
+            self.assertEqual([i['name'] for i in meals], ['Lunch', 'Dinner'])
+            self.test_client.get('/api/lists/1/entries')
+            with count_queries() as statements:
+                rsp = self.test_client.put('/api/lists/1/meals', json=[
+                    {'id': 2, 'name': 'Lunch'},
+                    {'id': 1, 'name': 'Dinner'},
+                ] + [{'name': 'Snack%d' % i} for i in range(50)])
+            self.assertEqual(rsp.status, '200 OK')
+            data = rsp.get_json()
+            self.assertEqual(data[:3], [
+                {'id': 2, 'name': 'Lunch'},
+                {'id': 1, 'name': 'Dinner'},
+                {'id': 3, 'name': 'Snack0'},
+            ])
+            self.assertEqual(len(data), 52)
+            self.assertEqual(
+                len([i for i in statements if i.startswith('INSERT')]), 1)
+            self.assertFalse([i for i in statements
+                              if i.startswith('INSERT INTO entry')])
+
+            rsp = self.test_client.put('/api/lists/1/meals', json=[
+                {'id': 1, 'name': 'Dinner'},
+            ])
+            self.assertEqual(rsp.get_json(), [{'id': 1, 'name': 'Dinner'}])
+            self.assertEqual(
+                {e.meal_id for e in Entry.query.all()}, {1})
+
+            rsp = self.test_client.put('/api/lists/1/meals', json=[
+                {'name': 'A'}, {'name': 'A'},
+            ])
+            self.assertEqual(rsp.status, '400 BAD REQUEST')
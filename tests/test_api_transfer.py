@@ -0,0 +1,184 @@
+import csv
+import io
+import json
+from datetime import date, timedelta
+from app import db
+from helpers import (push_dummy_user,
+                     push_dummy_list,
+                     APITestCase)
+
+
+class APIExportCase(APITestCase):
+
+    def fill(self):
+        today = date.today()
+        self.test_client.patch('/api/lists/1/entries', json=[
+            {'day': (today + timedelta(days=i)).isoformat(),
+             'meal_id': meal_id, 'value': f'Food {i} {meal_id}'}
+            for i in range(-30, 30, 3) for meal_id in [1, 2]
+        ])
+
+    def test_export_ndjson(self):
+        u = push_dummy_user()
+        push_dummy_list(u, 'TestyList')
+        with self.test_client:
+            self.login(u.username)
+            self.test_client.get('/api/lists/1/meals')
+            self.fill()
+            rsp = self.test_client.get('/api/lists/1/export')
+            self.assertEqual(rsp.status, '200 OK')
+            self.assertEqual(rsp.mimetype, 'application/x-ndjson')
+            self.assertTrue(rsp.is_streamed)
+            rows = [json.loads(i) for i in
+                    rsp.get_data(as_text=True).splitlines()]
+            self.assertEqual(len(rows), 40)
+            first = (date.today() - timedelta(days=30)).isoformat()
+            self.assertIsInstance(rows[0].pop('id'), int)
+            self.assertEqual(rows[0], {
+                'type': 'entry', 'date': first, 'meal': 'Lunch',
+                'value': 'Food -30 1', 'meal_id': 1})
+            self.assertEqual(rows[1]['meal'], 'Dinner')
+            self.assertEqual([i['date'] for i in rows],
+                             sorted(i['date'] for i in rows))
+
+    def test_export_csv_filtered(self):
+        u = push_dummy_user()
+        push_dummy_list(u, 'TestyList')
+        with self.test_client:
+            self.login(u.username)
+            self.test_client.get('/api/lists/1/meals')
+            self.fill()
+            today = date.today()
+            rsp = self.test_client.get(
+                '/api/lists/1/export?format=csv&meal_id=2'
+                f'&from={today.isoformat()}'
+                f'&to={(today + timedelta(days=9)).isoformat()}')
+            self.assertEqual(rsp.mimetype, 'text/csv')
+            rows = list(csv.DictReader(io.StringIO(
+                rsp.get_data(as_text=True))))
+            self.assertEqual([i['value'] for i in rows],
+                             ['Food 0 2', 'Food 3 2', 'Food 6 2', 'Food 9 2'])
+            self.assertEqual(rows[0]['meal'], 'Dinner')
+
+    def test_export_errors(self):
+        u = push_dummy_user()
+        other = push_dummy_user(email='test', username='test')
+        push_dummy_list(u, 'TestyList')
+        with self.test_client:
+            self.login(u.username)
+            for url in ['/api/lists/1/export?format=xml',
+                        '/api/lists/1/export?meal_id=x',
+                        '/api/lists/1/export?from=soon']:
+                rsp = self.test_client.get(url)
+                self.assertEqual(rsp.status, '400 BAD REQUEST', url)
+            self.logout()
+            self.login(other.username)
+            rsp = self.test_client.get('/api/lists/1/export')
+            self.assertEqual(rsp.status, '403 FORBIDDEN')
+
+
+class APIImportCase(APITestCase):
+
+    def test_import_ndjson(self):
+        u = push_dummy_user()
+        push_dummy_list(u, 'TestyList')
+        lines = [
+            {'date': '2020-01-01', 'meal': 'Breakfast', 'value': 'Eggs'},
+            {'date': '2020-01-01', 'meal': 'Dinner', 'value': 'Soup'},
+            {'type': 'entry', 'date': '2020-01-02', 'meal': 'Breakfast',
+             'value': 'Toast'},
+            {'type': 'food', 'name': 'Soup', 'categories': ['Warm', 'Easy'],
+             'ingredients': ['Water', 'Salt']},
+            {'name': 'Toast', 'categories': ['Easy']},
+            {'date': 'someday', 'meal': 'Lunch', 'value': 'x'},
+            {'type': 'drink', 'name': 'Tea'},
+        ]
+        body = '\n'.join(json.dumps(i) for i in lines) + '\nnot json\n'
+        with self.test_client:
+            self.login(u.username)
+            rsp = self.test_client.post(
+                '/api/lists/1/import', data=body,
+                content_type='application/x-ndjson')
+            self.assertEqual(rsp.status, '200 OK')
+            data = rsp.get_json()
+            self.assertEqual(data['rows'], 8)
+            self.assertEqual(data['entries'], 3)
+            self.assertEqual(data['foods'], 2)
+            self.assertEqual(data['errors'], 3)
+            self.assertEqual([i['line'] for i in data['error_details']],
+                             [6, 7, 8])
+            self.assertIn('rows_per_second', data)
+
+            meals = self.test_client.get('/api/lists/1/meals').get_json()
+            self.assertEqual([i['name'] for i in meals],
+                             ['Breakfast', 'Dinner'])
+            foods = self.test_client.get('/api/lists/1/foods').get_json()
+            self.assertEqual([i['name'] for i in foods], ['Soup', 'Toast'])
+            categories = self.test_client.get(
+                '/api/lists/1/categories').get_json()
+            self.assertEqual(sorted(i['name'] for i in categories),
+                             ['Easy', 'Warm'])
+            self.assertEqual(len(foods[0]['categories']), 2)
+            exported = [json.loads(i) for i in self.test_client.get(
+                '/api/lists/1/export').get_data(as_text=True).splitlines()]
+            self.assertEqual([(i['date'], i['meal'], i['value'])
+                              for i in exported],
+                             [('2020-01-01', 'Breakfast', 'Eggs'),
+                              ('2020-01-01', 'Dinner', 'Soup'),
+                              ('2020-01-02', 'Breakfast', 'Toast')])
+
+    def test_import_foods_changes_versions(self):
+        u = push_dummy_user()
+        push_dummy_list(u, 'TestyList')
+        with self.test_client:
+            self.login(u.username)
+            self.test_client.get('/api/lists/1/foods/search?q=ap')
+            etag = self.test_client.get('/api/lists/1/foods').headers['ETag']
+            self.test_client.post(
+                '/api/lists/1/import',
+                data=json.dumps({'type': 'food', 'name': 'Apple pie'}),
+                content_type='application/x-ndjson')
+            # later requests only see what the import committed
+            db.session.remove()
+            rsp = self.test_client.get('/api/lists/1/foods',
+                                       headers={'If-None-Match': etag})
+            self.assertEqual(rsp.status, '200 OK')
+            self.assertNotEqual(rsp.headers['ETag'], etag)
+            rsp = self.test_client.get('/api/lists/1/foods/search?q=ap')
+            self.assertEqual([i['name'] for i in rsp.get_json()],
+                             ['Apple pie'])
+
+    def test_import_csv_in_chunks(self):
+        from app.api import transfer
+        u = push_dummy_user()
+        push_dummy_list(u, 'TestyList')
+        rows = ['date,meal,value']
+        rows += [f'2020-01-{d:02},Lunch,Food {d}' for d in range(1, 11)]
+        # a later row overwrites an earlier one
+        rows.append('2020-01-01,Lunch,Pasta')
+        chunk_size = transfer.CHUNK_SIZE
+        transfer.CHUNK_SIZE = 3
+        try:
+            with self.test_client:
+                self.login(u.username)
+                rsp = self.test_client.post(
+                    '/api/lists/1/import', data='\n'.join(rows),
+                    content_type='text/csv')
+                self.assertEqual(rsp.get_json()['entries'], 11)
+                rsp = self.test_client.post(
+                    '/api/lists/1/import?format=csv',
+                    data='name,categories,ingredients\n'
+                         'Pasta,Italian;Easy,Flour;Eggs\n'
+                         'Pasta,Quick,Salt\n')
+                self.assertEqual(rsp.get_json()['foods'], 2)
+                csv_export = self.test_client.get(
+                    '/api/lists/1/export?format=csv').get_data(as_text=True)
+                foods = self.test_client.get(
+                    '/api/lists/1/foods').get_json()
+        finally:
+            transfer.CHUNK_SIZE = chunk_size
+        exported = list(csv.DictReader(io.StringIO(csv_export)))
+        self.assertEqual(len(exported), 10)
+        self.assertEqual(exported[0]['value'], 'Pasta')
+        self.assertEqual(len(foods), 1)
+        self.assertEqual(len(foods[0]['categories']), 3)
@@ -0,0 +1,63 @@
+import json
+from helpers import (push_dummy_user,
+                     push_dummy_list,
+                     APITestCase,
+                     TestConfig)
+
+
+class InstrumentedConfig(TestConfig):
+    SQL_INSTRUMENTATION = True
+    SLOW_QUERY_THRESHOLD_MS = 10000
+
+
+class SlowQueryConfig(InstrumentedConfig):
+    SLOW_QUERY_THRESHOLD_MS = 0
+
+
+class InstrumentationCase(APITestCase):
+    config_class = InstrumentedConfig
+
+    def test_server_timing(self):
+        u = push_dummy_user()
+        push_dummy_list(u, 'List')
+        with self.test_client:
+            self.login(u.username)
+            with self.assertLogs(self.app.logger, 'INFO') as logs:
+                rsp = self.test_client.get('/api/lists/1/meals')
+            self.assertEqual(rsp.status, '200 OK')
+            timing = rsp.headers['Server-Timing']
+            self.assertIn('db;dur=', timing)
+            self.assertIn('app;dur=', timing)
+            line = json.loads(logs.records[-1].getMessage())
+            self.assertEqual(line['endpoint'], 'api.get_meals')
+            self.assertEqual(line['status'], 200)
+            self.assertGreater(line['sql_count'], 0)
+            self.assertIn(f'desc="{line["sql_count"]} queries"', timing)
+            self.assertLessEqual(len(line['slowest']), 3)
+
+
+class UninstrumentedCase(APITestCase):
+
+    def test_disabled_by_default(self):
+        u = push_dummy_user()
+        with self.test_client:
+            self.login(u.username)
+            rsp = self.test_client.get('/api/lists')
+            self.assertNotIn('Server-Timing', rsp.headers)
+
+
+class SlowQueryCase(APITestCase):
+    config_class = SlowQueryConfig
+
+    def test_slow_query_logged(self):
+        u = push_dummy_user()
+        push_dummy_list(u, 'List')
+        with self.test_client:
+            self.login(u.username)
+            with self.assertLogs(self.app.logger, 'WARNING') as logs:
+                self.test_client.get('/api/lists/1/meals')
+            message = logs.records[0].getMessage()
+            self.assertIn('Slow query', message)
+            self.assertIn('SELECT', message)
+            self.assertIn('decorators.py', message)
+            self.assertNotIn('Parameters', message)
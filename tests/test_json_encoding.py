@@ -0,0 +1,77 @@
+import json
+import unittest
+from datetime import date, datetime
+from flask import jsonify
+from app.models import MealInfo
+from app.service import json_encoding
+from app.service.json_encoding import Fragment
+from helpers import (push_dummy_user,
+                     push_dummy_list,
+                     APITestCase,
+                     TestConfig)
+
+
+class StdlibConfig(TestConfig):
+    JSON_BACKEND = 'json'
+
+
+class JSONEncodingCase(APITestCase):
+    config_class = StdlibConfig
+
+    def encode(self, backend, obj):
+        self.app.config['JSON_BACKEND'] = backend
+        json_encoding.init_app(self.app)
+        with self.app.test_request_context():
+            return jsonify(obj).get_data(as_text=True)
+
+    def test_backends_agree(self):
+        obj = {
+            'day': date(2020, 1, 2),
+            'at': datetime(2020, 1, 2, 3, 4, 5),
+            'meals': [MealInfo(1, 'Lunch', 0)],
+            'name': 'Crème brûlée',
+            'cached': Fragment(b'[{"id":1,"name":"Lunch"}]'),
+            'nested': [Fragment('{"a":1}'), Fragment('2')],
+            'b': None,
+        }
+        expected = {
+            'day': 'Thu, 02 Jan 2020 00:00:00 GMT',
+            'at': 'Thu, 02 Jan 2020 03:04:05 GMT',
+            'meals': [[1, 'Lunch', 0]],
+            'name': 'Crème brûlée',
+            'cached': [{'id': 1, 'name': 'Lunch'}],
+            'nested': [{'a': 1}, 2],
+            'b': None,
+        }
+        for backend, module, _ in json_encoding.BACKENDS:
+            if not module:
+                continue
+            text = self.encode(backend, obj)
+            self.assertEqual(json.loads(text), expected, backend)
+            self.assertLess(text.index('"at"'), text.index('"b"'), backend)
+        self.assertEqual(self.encode('json', Fragment('[1,2]')).strip(),
+                         '[1,2]')
+
+    def test_backend_choice(self):
+        self.app.config['JSON_BACKEND'] = 'auto'
+        json_encoding.init_app(self.app)
+        expected = next(e for _, m, e in json_encoding.BACKENDS if m)
+        self.assertIs(self.app.json_encoder, expected)
+        self.app.config['JSON_BACKEND'] = 'yaml'
+        with self.assertRaises(ValueError):
+            json_encoding.init_app(self.app)
+
+    @unittest.skipUnless(json_encoding.orjson, 'needs orjson')
+    def test_api_with_orjson(self):
+        self.app.config['JSON_BACKEND'] = 'orjson'
+        json_encoding.init_app(self.app)
+        u = push_dummy_user()
+        push_dummy_list(u, 'TestyList')
+        with self.test_client:
+            self.login(u.username)
+            rsp = self.test_client.get('/api/lists/1/days')
+            day = rsp.get_json()[0]['day']
+            self.assertTrue(day.endswith(' 00:00:00 GMT'), day)
+            rsp = self.test_client.get('/api/lists/1/meals')
+            self.assertEqual(rsp.get_json(), [{'id': 1, 'name': 'Lunch'},
+                                              {'id': 2, 'name': 'Dinner'}])
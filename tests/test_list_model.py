@@ -4,7 +4,8 @@ from unittest.mock import patch
 from app import db
 from app.models import (List, ListPermission, ListSettings,
                         Entry, User, Day, Meal)
-from helpers import push_dummy_user, push_dummy_list, AppModelCase
+from helpers import (push_dummy_user, push_dummy_list, count_queries,
+                     AppModelCase)
 
 
 class ListModelCase(AppModelCase):
@@ -111,6 +112,50 @@ class ListModelCase(AppModelCase):
         c_days = c.get_or_create_days()
         self.assertEqual(c_days, days)
 
+    @patch.object(List, 'get_settings_for_user')
+    def test_get_or_create_days_query_count(self, mock_get_settings):
+        mock_get_settings.return_value = ListSettings(
+            start_day_of_week=-1, days_to_display=7)
+        u = push_dummy_user()
+        list_ = push_dummy_list(u, 'list_')
+        list_.get_or_create_days(limit=2)
+        with count_queries() as small:
+            small_days = list_.get_or_create_days(limit=3)
+        with count_queries() as large:
+            large_days = list_.get_or_create_days(limit=25)
+        self.assertEqual(len(small), len(large))
+        self.assertEqual(len(large_days), 25)
+        self.assertEqual(large_days[:3], small_days)
+        self.assertEqual([d.day for d in large_days],
+                         [date.today() + timedelta(days=i)
+                          for i in range(25)])
+        with count_queries() as cached:
+            self.assertEqual(
+                list_.get_or_create_days(limit=25), large_days)
+        self.assertEqual(len(cached), 1)
+
+    @patch.object(List, 'get_settings_for_user')
+    def test_get_or_create_entries(self, mock_get_settings):
+        mock_get_settings.return_value = ListSettings(
+            start_day_of_week=-1, days_to_display=7)
+        u = push_dummy_user()
+        list_ = push_dummy_list(u, 'list_')
+        days = list_.get_or_create_days()
+        list_.get_or_create_entries(days[:2])
+        db.session.add(Meal(list_id=list_.id, name='Breakfast', order=-1))
+        db.session.commit()
+        days = list_.get_or_create_days()
+        with count_queries() as queries:
+            entries = list_.get_or_create_entries(days)
+        self.assertEqual(len(queries), 4)
+        self.assertEqual(len(entries), 7)
+        for day, day_entries in zip(days, entries):
+            self.assertEqual([e.day_id for e in day_entries], [day.id] * 3)
+            self.assertEqual([e.meal.name for e in day_entries],
+                             ['Breakfast', 'Lunch', 'Dinner'])
+        self.assertEqual(Entry.query.count(), 21)
+        self.assertEqual(list_.get_or_create_entries([]), [])
+
     def test_get_or_create_meals(self):
         u = push_dummy_user()
         list_no_meals = push_dummy_list(u, 'List')
@@ -196,3 +241,48 @@ class ListModelCase(AppModelCase):
             'foods': [],
             'categories': []
         })
+
+    def test_meal_schema_is_cached(self):
+        u = push_dummy_user()
+        first = push_dummy_list(u, 'First')
+        second = push_dummy_list(u, 'Second')
+        with count_queries() as queries:
+            schemas = List.get_meal_schemas({
+                first.id: first.last_updated, second.id: second.last_updated})
+        self.assertEqual(
+            len([i for i in queries if 'FROM meals' in i]), 2)
+        self.assertEqual(schemas[first.id],
+                         ((1, 'Lunch', 0), (2, 'Dinner', 1)))
+        with count_queries() as queries:
+            self.assertEqual(second.get_or_create_meals(), schemas[second.id])
+        self.assertFalse([i for i in queries if 'FROM meals' in i])
+
+        db.session.add(Meal(list_id=first.id, name='Breakfast', order=-1))
+        db.session.commit()
+        self.assertEqual([m.name for m in first.get_or_create_meals()],
+                         ['Breakfast', 'Lunch', 'Dinner'])
+        first.touch()
+        db.session.commit()
+        with count_queries() as queries:
+            first.get_or_create_meals()
+        self.assertEqual(
+            len([i for i in queries if 'FROM meals' in i]), 1)
+
+    @patch.object(List, 'get_settings_for_user')
+    def test_get_entries_reads_rows(self, mock_get_settings):
+        mock_get_settings.return_value = ListSettings(
+            start_day_of_week=-1, days_to_display=7)
+        u = push_dummy_user()
+        list_ = push_dummy_list(u, 'list_')
+        days = list_.get_or_create_days()
+        list_.get_entries(days)
+        db.session.remove()
+        list_ = List.query.first()
+        days = list_.get_or_create_days()
+        with count_queries() as queries:
+            entries = list_.get_entries(days)
+        self.assertEqual(len(queries), 1)
+        self.assertIn('JOIN meals', queries[0])
+        self.assertEqual([e.to_dict()['key'] for e in entries[0]],
+                         ['Lunch', 'Dinner'])
+        self.assertEqual(len(db.session.identity_map), len(days) + 1)
@@ -0,0 +1,61 @@
+from prometheus_client import REGISTRY
+from helpers import (push_dummy_user,
+                     push_dummy_list,
+                     APITestCase)
+
+
+def sample(name, **labels):
+    return REGISTRY.get_sample_value(name, labels) or 0
+
+
+class MetricsCase(APITestCase):
+
+    def test_metrics_endpoint(self):
+        u = push_dummy_user()
+        push_dummy_list(u, 'List')
+        with self.test_client:
+            self.login(u.username)
+            before = sample('foodlist_requests_total', blueprint='api',
+                            endpoint='api.get_meals', method='GET',
+                            status='200')
+            self.test_client.get('/api/lists/1/meals')
+            rsp = self.test_client.get('/metrics')
+            self.assertEqual(rsp.status, '200 OK')
+            body = rsp.get_data(as_text=True)
+            self.assertIn('foodlist_request_duration_seconds_bucket', body)
+            self.assertIn('foodlist_sql_statements_per_request_count', body)
+            self.assertIn('foodlist_db_pool_checked_out', body)
+            self.assertEqual(
+                sample('foodlist_requests_total', blueprint='api',
+                       endpoint='api.get_meals', method='GET',
+                       status='200'),
+                before + 1)
+
+    def test_rows_created(self):
+        u = push_dummy_user()
+        push_dummy_list(u, 'List')
+        with self.test_client:
+            self.login(u.username)
+            days = sample('foodlist_rows_created_total', table='day')
+            entries = sample('foodlist_rows_created_total', table='entry')
+            self.test_client.get('/api/lists/1/entries')
+            self.assertEqual(
+                sample('foodlist_rows_created_total', table='day'),
+                days + 7)
+            self.assertEqual(
+                sample('foodlist_rows_created_total', table='entry'),
+                entries + 14)
+            self.test_client.get('/api/lists/1/entries')
+            self.assertEqual(
+                sample('foodlist_rows_created_total', table='entry'),
+                entries + 14)
+
+            # writes that create rows are not reads creating them
+            self.test_client.patch('/api/lists/1/entries', json=[
+                {'day': '2000-01-01', 'meal_id': 1, 'value': 'Old'}])
+            self.assertEqual(
+                sample('foodlist_rows_created_total', table='entry'),
+                entries + 14)
+            self.assertEqual(
+                sample('foodlist_rows_created_total', table='day'),
+                days + 7)
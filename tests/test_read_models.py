@@ -0,0 +1,53 @@
+from app import db
+from app.models import (Food, FoodCategory, FoodCategoryAssociation, List,
+                        ListPermission)
+from app.service import read_models
+from helpers import push_dummy_user, push_dummy_list, AppModelCase
+
+
+class ReadModelsCase(AppModelCase):
+    def setUp(self):
+        super().setUp()
+        self.u = push_dummy_user()
+        self.other = push_dummy_user(email='other', username='other')
+        list_ = push_dummy_list(self.u, 'List')
+        db.session.add(ListPermission(list_id=list_.id, user_id=self.other.id,
+                                      permission_level='member'))
+        db.session.add_all([Food(list_id=list_.id, name='A'),
+                            Food(list_id=list_.id, name='B'),
+                            FoodCategory(list_id=list_.id, name='X'),
+                            FoodCategory(list_id=list_.id, name='Y')])
+        db.session.commit()
+        db.session.add_all([
+            FoodCategoryAssociation(food_id=2, category_id=2),
+            FoodCategoryAssociation(food_id=2, category_id=1)])
+        db.session.commit()
+
+    def test_match_to_dict(self):
+        list_ = List.query.first()
+        self.assertEqual(read_models.foods(list_.id),
+                         [f.to_dict() for f in list_.foods])
+        self.assertEqual(read_models.foods(list_.id, [2]),
+                         [{'id': 2, 'name': 'B', 'categories': [2, 1]}])
+        self.assertEqual(read_models.foods(list_.id, []), [])
+        self.assertEqual(read_models.categories(list_.id),
+                         [c.to_dict() for c in list_.categories])
+        self.assertEqual(read_models.shares(list_.id),
+                         [p.to_dict() for p in list_.users])
+        self.assertEqual(read_models.meals(list_),
+                         [{'id': 1, 'name': 'Lunch'},
+                          {'id': 2, 'name': 'Dinner'}])
+        self.assertEqual(read_models.users(self.u.id), [
+            {'id': 1, 'username': 'doodle',
+             'email': 'doodle@doodlydoo.com', 'firstname': None,
+             'lastname': None},
+            {'id': 2, 'username': 'other'},
+        ])
+
+    def test_loads_no_instances(self):
+        db.session.remove()
+        read_models.foods(1)
+        read_models.categories(1)
+        read_models.shares(1)
+        read_models.users(1)
+        self.assertEqual(len(db.session.identity_map), 0)
@@ -0,0 +1,120 @@
+import os
+import tempfile
+import unittest
+from app.service.response_cache import MemoryCache, SharedCache
+from helpers import (push_dummy_user,
+                     push_dummy_list,
+                     count_queries,
+                     APITestCase,
+                     TestConfig)
+
+
+class MemoryCacheConfig(TestConfig):
+    RESPONSE_CACHE = 'memory'
+
+
+class SharedCacheConfig(TestConfig):
+    RESPONSE_CACHE = 'shared'
+    RESPONSE_CACHE_DIR = tempfile.mkdtemp()
+
+
+class APIResponseCacheCase(APITestCase):
+    config_class = MemoryCacheConfig
+
+    def test_cached_reads(self):
+        u = push_dummy_user()
+        push_dummy_list(u, 'List')
+        with self.test_client:
+            self.login(u.username)
+            for url in ['/api/lists/1', '/api/lists/1/days',
+                        '/api/lists/1/entries', '/api/lists/1/foods',
+                        '/api/lists/1/meals', '/api/lists/1/categories']:
+                first = self.test_client.get(url)
+                with count_queries() as statements:
+                    second = self.test_client.get(url)
+                self.assertEqual(second.status, '200 OK')
+                self.assertEqual(second.get_json(), first.get_json())
+                self.assertEqual(second.headers['ETag'],
+                                 first.headers['ETag'])
+                # the user and the list for the access check
+                self.assertLessEqual(len(statements), 3, url)
+
+    def test_write_invalidates(self):
+        u = push_dummy_user()
+        push_dummy_list(u, 'List')
+        with self.test_client:
+            self.login(u.username)
+            entries = self.test_client.get('/api/lists/1/entries')
+            entry_id = entries.get_json()[0]['id']
+            self.test_client.patch(f'/api/entries/{entry_id}',
+                                   json={'value': 'Pizza'})
+            rsp = self.test_client.get('/api/lists/1/entries')
+            self.assertEqual(rsp.get_json()[0]['value'], 'Pizza')
+            self.test_client.post('/api/lists/1/foods', json={'name': 'Soup'})
+            rsp = self.test_client.get('/api/lists/1/foods')
+            self.assertEqual([i['name'] for i in rsp.get_json()], ['Soup'])
+
+    def test_cache_is_per_user(self):
+        u = push_dummy_user()
+        other = push_dummy_user(email='test', username='test')
+        push_dummy_list(u, 'List')
+        with self.test_client:
+            self.login(u.username)
+            self.test_client.get('/api/lists/1')
+            self.logout()
+            self.login(other.username)
+            rsp = self.test_client.get('/api/lists/1')
+            self.assertEqual(rsp.status, '403 FORBIDDEN')
+
+
+class APISharedResponseCacheCase(APITestCase):
+    config_class = SharedCacheConfig
+
+    def test_cached_reads(self):
+        u = push_dummy_user()
+        push_dummy_list(u, 'List')
+        with self.test_client:
+            self.login(u.username)
+            first = self.test_client.get('/api/lists/1/entries')
+            with count_queries() as statements:
+                second = self.test_client.get('/api/lists/1/entries')
+            self.assertEqual(second.get_json(), first.get_json())
+            self.assertLessEqual(len(statements), 3)
+
+    def test_size_measured_on_scrape(self):
+        u = push_dummy_user()
+        push_dummy_list(u, 'List')
+        with self.test_client:
+            self.login(u.username)
+            self.test_client.get('/api/lists/1/entries')
+            size = self.app.extensions['response_cache'].size()
+            body = self.test_client.get('/metrics').get_data(as_text=True)
+            self.assertGreater(size, 0)
+            self.assertIn(f'foodlist_response_cache_shared_bytes {size:.1f}',
+                          body)
+
+
+class CacheBackendsCase(unittest.TestCase):
+
+    def test_memory_lru(self):
+        cache = MemoryCache(2)
+        cache.set('a', b'1')
+        cache.set('b', b'2')
+        cache.get('a')
+        cache.set('c', b'3')
+        self.assertEqual(cache.get('a'), b'1')
+        self.assertIsNone(cache.get('b'))
+        self.assertEqual(cache.get('c'), b'3')
+
+    def test_shared(self):
+        directory = tempfile.mkdtemp()
+        cache = SharedCache(directory, 10)
+        other_worker = SharedCache(directory, 10)
+        cache.set('a', b'1')
+        self.assertEqual(other_worker.get('a'), b'1')
+        for i in range(20):
+            cache.set(f'key{i}', b'x')
+        self.assertIsNone(cache.get('key0'))
+        self.assertEqual(cache.get('key19'), b'x')
+        # every body left is one byte
+        self.assertEqual(other_worker.size(), len(os.listdir(directory)))